@@ -1,18 +1,20 @@
-"""POST /api/ingest — accepts input, creates job, starts background processing."""
+"""POST /api/ingest — accepts input and enqueues a job for the worker pool."""
 from __future__ import annotations
 
-import asyncio
 import uuid
-import base64
 from datetime import datetime, timezone
+from typing import Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, UploadFile, Form
+from fastapi import APIRouter, Depends, File, UploadFile, Form
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
+from core.config import settings
 from core.database import get_db
 from models.schemas import Job, IngestRequest
-from jobs.process_job import process_job
+from services import artifact_store
+from services.upload_service import UploadTooLargeError, spool_upload
+from jobs.worker_pool import get_worker_pool
 
 router = APIRouter(prefix="/api", tags=["ingest"])
 
@@ -20,10 +22,20 @@ router = APIRouter(prefix="/api", tags=["ingest"])
 @router.post("/ingest")
 async def ingest(
     body: IngestRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ):
-    """Create a new processing job and start it in the background (JSON body)."""
+    """Create a new processing job and enqueue it (JSON body)."""
+    if body.input_type == "pdf":
+        # PDFs go to the artifact store, never into the job row
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "data": None,
+                "error": "Upload PDF files to /api/ingest/pdf.",
+            },
+        )
+
     job_id = str(uuid.uuid4())
 
     # Determine source text
@@ -38,21 +50,14 @@ async def ingest(
         progress=0,
         source=source,
         input_type=body.input_type,
+        generation_mode=body.generation_mode,
         created_at=datetime.now(timezone.utc),
         updated_at=datetime.now(timezone.utc),
     )
     db.add(job)
     db.commit()
 
-    def _run_async_job():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(process_job(job_id))
-        finally:
-            loop.close()
-
-    background_tasks.add_task(_run_async_job)
+    get_worker_pool().notify()
 
     return JSONResponse(
         content={
@@ -65,8 +70,8 @@ async def ingest(
 
 @router.post("/ingest/pdf")
 async def ingest_pdf(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    generation_mode: Optional[str] = Form(None, pattern="^(separate|combined)$"),
     db: Session = Depends(get_db),
 ):
     """Create a new processing job from a PDF file upload."""
@@ -81,46 +86,42 @@ async def ingest_pdf(
             },
         )
 
-    # Read file bytes
-    pdf_bytes = await file.read()
-
-    # Check file size (max 20MB)
-    if len(pdf_bytes) > 20 * 1024 * 1024:
+    # Stream the upload to disk in chunks, rejecting it as soon as it
+    # exceeds the size limit, then move it into the artifact store; the
+    # job keeps only its digest
+    max_bytes = settings.max_pdf_size_mb * 1024 * 1024
+    try:
+        async with spool_upload(
+            file, max_bytes, directory=artifact_store.staging_dir()
+        ) as spooled:
+            artifact_hash = artifact_store.adopt(spooled.path, spooled.sha256)
+    except UploadTooLargeError:
         return JSONResponse(
-            status_code=400,
+            status_code=413,
             content={
                 "success": False,
                 "data": None,
-                "error": "PDF file exceeds 20MB limit.",
+                "error": f"PDF file exceeds {settings.max_pdf_size_mb}MB limit.",
             },
         )
 
     job_id = str(uuid.uuid4())
 
-    # Store PDF bytes as base64 in the source field
-    pdf_b64 = base64.b64encode(pdf_bytes).decode("utf-8")
-
     job = Job(
         id=job_id,
         status="pending",
         progress=0,
-        source=pdf_b64,
+        source=file.filename,
         input_type="pdf",
+        artifact_hash=artifact_hash,
+        generation_mode=generation_mode,
         created_at=datetime.now(timezone.utc),
         updated_at=datetime.now(timezone.utc),
     )
     db.add(job)
     db.commit()
 
-    def _run_async_job():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(process_job(job_id))
-        finally:
-            loop.close()
-
-    background_tasks.add_task(_run_async_job)
+    get_worker_pool().notify()
 
     return JSONResponse(
         content={
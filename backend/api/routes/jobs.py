@@ -0,0 +1,213 @@
+"""Job routes — live token stream of a job's artifacts and retries."""
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database import SessionLocal, get_db
+from models.schemas import Job, JobArtifact
+from services.event_bus import (
+    LAGGED,
+    SSE_HEADERS,
+    SSE_KEEPALIVE,
+    db_recheck_seconds,
+    drain,
+    format_sse,
+    get_event_bus,
+)
+from services.job_stream import partial_artifacts, stream_topic
+from jobs.worker_pool import get_worker_pool
+
+router = APIRouter(prefix="/api", tags=["jobs"])
+
+ARTIFACTS = ("theory", "notebook", "flowchart")
+TERMINAL_STATUSES = ("done", "error")
+
+
+def _load_job(job_id: str) -> Optional[tuple[str, Optional[str], Optional[str]]]:
+    """Return (status, result_json, error_msg) for a job, or None."""
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            return None
+        return job.status, job.result_json, job.error_msg
+    finally:
+        db.close()
+
+
+def _stored_artifacts(job_id: str) -> dict[str, str]:
+    """Return {artifact: content} for the artifacts a job has finished."""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(JobArtifact)
+            .filter(JobArtifact.job_id == job_id, JobArtifact.status == "done")
+            .all()
+        )
+        return {row.artifact: row.content for row in rows}
+    finally:
+        db.close()
+
+
+def _final_events(job_id: str, finished: frozenset[str] = frozenset()) -> list[str]:
+    """Events that close a stream: stored artifacts not yet sent, then done/error."""
+    loaded = _load_job(job_id)
+    if loaded is None:
+        return [format_sse("error", {"error": f"Job {job_id} not found"})]
+    status, result_json, error_msg = loaded
+    if status == "done":
+        result = json.loads(result_json) if result_json else {}
+        stored = {a: result[a]["content"] for a in ARTIFACTS if a in result}
+    else:
+        # A failed job keeps the artifacts that did finish
+        stored = _stored_artifacts(job_id)
+
+    events = [
+        format_sse("artifact_done", {"artifact": artifact, "content": stored[artifact]})
+        for artifact in ARTIFACTS
+        if artifact in stored and artifact not in finished
+    ]
+    if status == "done":
+        events.append(format_sse("done", {}))
+    else:
+        events.append(format_sse("error", {"error": error_msg}))
+    return events
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """Server-sent events stream of a job's output as it is generated.
+
+    Events: ``snapshot`` (text generated before the client connected),
+    ``token``, ``reset`` (generation restarted on the fallback model) and
+    ``artifact_done`` — each tagged with its ``artifact`` — then ``done`` or
+    ``error``. A client too slow to keep up gets ``resync`` with the full
+    text of every artifact so far (``{"artifacts": {...}}``), which replaces
+    everything it has built from earlier events.
+
+    Tokens only reach this process from embedded workers. For jobs run by
+    standalone workers, or that finish without streaming (cache hits,
+    coalesced jobs), an idle stream re-reads the database every
+    ``db_recheck_seconds()`` and sends ``artifact_done`` for each artifact
+    stored since, then ``done`` or ``error``.
+    """
+    bus = get_event_bus()
+
+    async def _events() -> AsyncIterator[str]:
+        # Subscribe before taking the snapshot so no token is missed
+        async with bus.subscribe(stream_topic(job_id)) as queue:
+            loaded = _load_job(job_id)
+            if loaded is None or loaded[0] in TERMINAL_STATUSES:
+                for event in _final_events(job_id):
+                    yield event
+                return
+
+            for artifact, content in partial_artifacts(job_id).items():
+                yield format_sse("snapshot", {"artifact": artifact, "content": content})
+
+            finished: set[str] = set()
+            loop = asyncio.get_running_loop()
+            last_sent = loop.time()
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=db_recheck_seconds()
+                    )
+                except asyncio.TimeoutError:
+                    loaded = _load_job(job_id)
+                    if loaded is not None and loaded[0] not in TERMINAL_STATUSES:
+                        # Artifacts stored by a worker in another process
+                        for artifact, content in _stored_artifacts(job_id).items():
+                            if artifact not in finished:
+                                finished.add(artifact)
+                                last_sent = loop.time()
+                                yield format_sse(
+                                    "artifact_done",
+                                    {"artifact": artifact, "content": content},
+                                )
+                        if loop.time() - last_sent >= settings.sse_keepalive_seconds:
+                            last_sent = loop.time()
+                            yield SSE_KEEPALIVE
+                        continue
+                    message = {"event": "done"}
+
+                if message is LAGGED:
+                    # Tokens were dropped; replace the client's text with
+                    # the buffers, which already hold every dropped token
+                    drain(queue)
+                    loaded = _load_job(job_id)
+                    if loaded is None or loaded[0] not in TERMINAL_STATUSES:
+                        yield format_sse(
+                            "resync", {"artifacts": partial_artifacts(job_id)}
+                        )
+                        continue
+                    message = {"event": "done"}
+
+                if message["event"] in TERMINAL_STATUSES:
+                    for event in _final_events(job_id, frozenset(finished)):
+                        yield event
+                    return
+                if message["event"] == "artifact_done":
+                    if message["data"]["artifact"] in finished:
+                        continue  # already sent from the database
+                    finished.add(message["data"]["artifact"])
+                last_sent = loop.time()
+                yield format_sse(message["event"], message["data"])
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.post("/jobs/{job_id}/retry")
+async def retry_job(job_id: str, db: Session = Depends(get_db)):
+    """Re-queue a failed job. Artifacts that already finished are kept and
+    only the failed ones are generated again."""
+    job = db.query(Job).filter(Job.id == job_id).first()
+
+    if not job:
+        return JSONResponse(
+            status_code=404,
+            content={
+                "success": False,
+                "data": None,
+                "error": f"Job {job_id} not found",
+            },
+        )
+
+    if job.status != "error":
+        return JSONResponse(
+            status_code=409,
+            content={
+                "success": False,
+                "data": None,
+                "error": f"Only failed jobs can be retried (status: {job.status})",
+            },
+        )
+
+    job.status = "pending"
+    job.progress = 0
+    job.error_msg = None
+    job.worker_id = None
+    job.lease_expires_at = None
+    job.updated_at = datetime.now(timezone.utc)
+    db.commit()
+    get_worker_pool().notify()
+
+    return JSONResponse(
+        content={
+            "success": True,
+            "data": {"jobId": job_id},
+            "error": None,
+        }
+    )
@@ -1,49 +1,136 @@
-"""GET /api/results/{job_id} — returns full result JSON when job is done."""
+"""GET /api/results/{job_id}[/{artifact}] — result JSON, partial while a job runs."""
 from __future__ import annotations
 
 import json
+from typing import Optional
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.orm import Session
 
 from core.database import get_db
-from models.schemas import Job
+from core.middleware import strip_etag_coding
+from models.schemas import Job, JobArtifact, compute_etag
 
 router = APIRouter(prefix="/api", tags=["results"])
 
+ARTIFACTS = ("theory", "notebook", "flowchart")
+
+# Finished results never change once stored
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _not_found(error: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=404,
+        content={"success": False, "data": None, "error": error},
+    )
+
+
+def _matching_etag(request: Request, etag: str) -> Optional[str]:
+    """The If-None-Match tag covering ``etag``, ignoring the content-coding
+    suffix added by the compressor, or None."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    if header.strip() == "*":
+        return etag
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if strip_etag_coding(tag) == etag:
+            return tag
+    return None
+
+
+def _stored_json_response(request: Request, data_json: str, etag: str) -> Response:
+    """Serve already-serialised result JSON in the API envelope, honouring
+    If-None-Match. The stored JSON is spliced in as-is, never re-parsed."""
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    matched = _matching_etag(request, etag)
+    if matched is not None:
+        # Echo the client's tag: it names the coding the 304 stands in for
+        return Response(status_code=304, headers={**headers, "ETag": matched})
+    return Response(
+        content='{"success": true, "data": ' + data_json + ', "error": null}',
+        media_type="application/json",
+        headers=headers,
+    )
+
 
 @router.get("/results/{job_id}")
-async def get_results(job_id: str, db: Session = Depends(get_db)):
-    """Return the full result JSON for a completed job."""
+async def get_results(job_id: str, request: Request, db: Session = Depends(get_db)):
+    """Return the result JSON for a job.
+
+    A completed job returns its full result. A running or failed job returns
+    the artifacts finished so far with ``partial: true`` and the names of the
+    ``pending`` and ``failed`` ones.
+    """
     job = db.query(Job).filter(Job.id == job_id).first()
 
     if not job:
-        return JSONResponse(
-            status_code=404,
-            content={
-                "success": False,
-                "data": None,
-                "error": f"Job {job_id} not found",
-            },
-        )
-
-    if job.status != "done":
-        return JSONResponse(
-            status_code=404,
-            content={
-                "success": False,
-                "data": None,
-                "error": f"Job {job_id} is not complete yet (status: {job.status})",
-            },
-        )
-
-    result_data = json.loads(job.result_json) if job.result_json else {}
+        return _not_found(f"Job {job_id} not found")
+
+    if job.status == "done":
+        if job.result_etag is None:
+            # Jobs finished before ETags were stored: hash once and keep it
+            job.result_etag = compute_etag(job.result_json or "{}")
+            db.commit()
+        return _stored_json_response(request, job.result_json or "{}", job.result_etag)
+
+    rows = db.query(JobArtifact).filter(JobArtifact.job_id == job_id).all()
+    done = {row.artifact: row.content for row in rows if row.status == "done"}
+    if not done:
+        return _not_found(f"Job {job_id} is not complete yet (status: {job.status})")
+
+    failed = [row.artifact for row in rows if row.status == "error"]
+    result_data = {
+        "jobId": job_id,
+        "source": job.source[:200],
+        **{name: {"content": content} for name, content in done.items()},
+        "partial": True,
+        "status": job.status,
+        "pending": [a for a in ARTIFACTS if a not in done and a not in failed],
+        "failed": failed,
+    }
 
     return JSONResponse(
         content={
             "success": True,
             "data": result_data,
             "error": None,
-        }
+        },
+        headers={"Cache-Control": "no-cache"},
     )
+
+
+@router.get("/results/{job_id}/{artifact}")
+async def get_artifact(
+    job_id: str, artifact: str, request: Request, db: Session = Depends(get_db)
+):
+    """Return a single finished artifact (theory, notebook or flowchart).
+
+    Served straight from per-artifact storage with a strong ETag; a matching
+    If-None-Match gets ``304 Not Modified``.
+    """
+    if artifact not in ARTIFACTS:
+        return _not_found(f"Unknown artifact {artifact!r}")
+
+    row = db.get(JobArtifact, (job_id, artifact))
+    if row is not None and row.status == "done":
+        if row.payload_json is None:
+            row.set_content(row.content)
+        return _stored_json_response(request, row.payload_json, row.etag)
+
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        return _not_found(f"Job {job_id} not found")
+
+    if job.status == "done" and job.result_json:
+        # Jobs finished before per-artifact storage only have the full blob
+        blob_row = JobArtifact(job_id=job_id, artifact=artifact)
+        blob_row.set_content(json.loads(job.result_json)[artifact]["content"])
+        return _stored_json_response(request, blob_row.payload_json, blob_row.etag)
+
+    if row is not None:
+        return _not_found(f"Artifact {artifact} failed: {row.error_msg.splitlines()[0]}")
+    return _not_found(f"Artifact {artifact} is not ready yet (status: {job.status})")
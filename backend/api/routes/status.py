@@ -1,15 +1,31 @@
 """GET /api/status/{job_id} — returns current job status and progress."""
 from __future__ import annotations
 
+import asyncio
+from typing import AsyncIterator, Optional
+
 from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from core.database import get_db
+from core.config import settings
+from core.database import SessionLocal, get_db
 from models.schemas import Job
+from services.event_bus import (
+    LAGGED,
+    SSE_HEADERS,
+    SSE_KEEPALIVE,
+    db_recheck_seconds,
+    drain,
+    format_sse,
+    get_event_bus,
+    status_topic,
+)
 
 router = APIRouter(prefix="/api", tags=["status"])
 
+TERMINAL_STATUSES = ("done", "error")
+
 
 @router.get("/status/{job_id}")
 async def get_status(job_id: str, db: Session = Depends(get_db)):
@@ -29,11 +45,72 @@ async def get_status(job_id: str, db: Session = Depends(get_db)):
     return JSONResponse(
         content={
             "success": True,
-            "data": {
-                "status": job.status,
-                "progress": job.progress,
-                "error": job.error_msg,
-            },
+            "data": job.status_payload(),
             "error": None,
         }
     )
+
+
+def _load_status(job_id: str) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        return job.status_payload() if job else None
+    finally:
+        db.close()
+
+
+@router.get("/status/{job_id}/events")
+async def stream_status(job_id: str):
+    """Server-sent events stream of a job's status and progress.
+
+    The current state is read from the database once when the client
+    connects (or reconnects); after that, updates are pushed from the
+    in-process event bus as ``_update_job`` publishes them. The stream
+    ends after a terminal status. Updates from jobs run by standalone
+    worker processes never reach this process's bus, so an idle stream
+    re-reads the database every ``db_recheck_seconds()``: often when
+    embedded workers are off, at each keep-alive otherwise (a job may still
+    go to a standalone worker).
+    """
+    bus = get_event_bus()
+    topic = status_topic(job_id)
+
+    async def _events() -> AsyncIterator[str]:
+        # Subscribe before reading the snapshot so no update is missed
+        async with bus.subscribe(topic) as queue:
+            last = _load_status(job_id)
+            if last is None:
+                yield format_sse("error", {"error": f"Job {job_id} not found"})
+                return
+            yield format_sse("status", last)
+
+            loop = asyncio.get_running_loop()
+            last_sent = loop.time()
+            while last["status"] not in TERMINAL_STATUSES:
+                try:
+                    payload = await asyncio.wait_for(
+                        queue.get(), timeout=db_recheck_seconds()
+                    )
+                except asyncio.TimeoutError:
+                    if loop.time() - last_sent >= settings.sse_keepalive_seconds:
+                        last_sent = loop.time()
+                        yield SSE_KEEPALIVE
+                    payload = LAGGED
+                if payload is LAGGED:
+                    # Idle, or updates were dropped — the database has the
+                    # current state either way
+                    drain(queue)
+                    payload = _load_status(job_id)
+                    if payload is None:
+                        return
+                if payload != last:
+                    last = payload
+                    last_sent = loop.time()
+                    yield format_sse("status", payload)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
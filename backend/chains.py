@@ -5,7 +5,13 @@ from typing import AsyncIterator
 
 from langchain_core.messages import HumanMessage
 
-from llm import get_llm, prepare_transcript
+from llm import (
+    get_llm,
+    limited_ainvoke,
+    limited_astream,
+    prepare_transcript,
+    run_with_fallback,
+)
 from postprocess import fix_markdown
 
 
@@ -145,22 +151,20 @@ Write ONLY the Markdown content. No preamble. No commentary.
 async def _run_chain(prompt_template: str, transcript: str, use_fallback: bool = False) -> str:
     llm = get_llm(fallback=use_fallback)
     prompt = prompt_template.format(transcript=transcript)
-    response = await llm.ainvoke([HumanMessage(content=prompt)])
+    response = await limited_ainvoke(llm, [HumanMessage(content=prompt)])
     return fix_markdown(response.content)
 
 
 async def run_theory_chain(transcript: str) -> str:
-    try:
-        return await _run_chain(THEORY_PROMPT, transcript)
-    except Exception:
-        return await _run_chain(THEORY_PROMPT, transcript, use_fallback=True)
+    return await run_with_fallback(
+        lambda fallback: _run_chain(THEORY_PROMPT, transcript, use_fallback=fallback)
+    )
 
 
 async def run_notebook_chain(transcript: str) -> str:
-    try:
-        return await _run_chain(NOTEBOOK_PROMPT, transcript)
-    except Exception:
-        return await _run_chain(NOTEBOOK_PROMPT, transcript, use_fallback=True)
+    return await run_with_fallback(
+        lambda fallback: _run_chain(NOTEBOOK_PROMPT, transcript, use_fallback=fallback)
+    )
 
 
 async def run_chains(transcript: str) -> tuple[str, str]:
@@ -179,7 +183,7 @@ async def stream_theory_chain(transcript: str) -> AsyncIterator[str]:
         llm = get_llm()
         prompt = THEORY_PROMPT.format(transcript=transcript)
         buf: list[str] = []
-        async for chunk in llm.astream([HumanMessage(content=prompt)]):
+        async for chunk in limited_astream(llm, [HumanMessage(content=prompt)]):
             if hasattr(chunk, "content") and chunk.content:
                 buf.append(chunk.content)
                 yield chunk.content
@@ -194,7 +198,7 @@ async def stream_notebook_chain(transcript: str) -> AsyncIterator[str]:
     try:
         llm = get_llm()
         prompt = NOTEBOOK_PROMPT.format(transcript=transcript)
-        async for chunk in llm.astream([HumanMessage(content=prompt)]):
+        async for chunk in limited_astream(llm, [HumanMessage(content=prompt)]):
             if hasattr(chunk, "content") and chunk.content:
                 yield chunk.content
     except Exception as e:
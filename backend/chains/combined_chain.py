@@ -0,0 +1,143 @@
+"""Combined chain — generates theory, notebook and flowchart in one LLM call.
+
+The model writes the three artifacts as sections, each opened by its marker
+line from ``SECTION_MARKERS``. ``SectionSplitter`` routes the streamed
+tokens to the right artifact as they arrive; each section is then
+post-processed exactly like the output of its own chain.
+"""
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+from services.llm_service import get_llm, run_with_fallback, stream_llm
+from services.model_capabilities import combined_output_tokens
+from services.token_counter import count_tokens
+from services.job_stream import ArtifactStream
+from services.postprocess import fix_markdown
+from chains.prompts import COMBINED_PROMPT, SECTION_MARKERS, build_messages
+from chains.flowchart_chain import _clean_mermaid
+
+
+def _normalise_marker(line: str) -> str:
+    # Tolerate markers the model wraps in bold, heading or code markup
+    return line.strip().strip("*#` ").upper()
+
+
+class SectionSplitter:
+    """Split streamed text into sections at marker lines.
+
+    Text is passed on as soon as it cannot be part of a marker, so tokens
+    reach ``on_token(section, text)`` with at most one line of delay. Text
+    before the first marker is dropped.
+    """
+
+    def __init__(
+        self,
+        markers: dict[str, str],
+        on_token: Optional[Callable[[str, str], None]] = None,
+    ) -> None:
+        self._sections_by_marker = {marker: name for name, marker in markers.items()}
+        self._on_token = on_token
+        self.sections: dict[str, list[str]] = {name: [] for name in markers}
+        self.current: Optional[str] = None
+        self._line = ""            # start of the current line, held back
+        self._line_is_text = False  # current line can no longer be a marker
+
+    def feed(self, text: str) -> None:
+        while text:
+            newline = text.find("\n")
+            if newline < 0:
+                piece, text = text, ""
+            else:
+                piece, text = text[:newline + 1], text[newline + 1:]
+            self._feed_piece(piece)
+
+    def _feed_piece(self, piece: str) -> None:
+        ends_line = piece.endswith("\n")
+        if self._line_is_text:
+            self._emit(piece)
+        else:
+            self._line += piece
+            candidate = _normalise_marker(self._line)
+            if ends_line:
+                if candidate in self._sections_by_marker:
+                    self.current = self._sections_by_marker[candidate]
+                else:
+                    self._emit(self._line)
+                self._line = ""
+            elif not any(m.startswith(candidate) for m in self._sections_by_marker):
+                self._emit(self._line)
+                self._line = ""
+                self._line_is_text = True
+        if ends_line:
+            self._line_is_text = False
+
+    def _emit(self, text: str) -> None:
+        if self.current is None:
+            return
+        self.sections[self.current].append(text)
+        if self._on_token:
+            self._on_token(self.current, text)
+
+    def close(self) -> dict[str, str]:
+        """Flush the last line and return the raw text of every section."""
+        if self._line:
+            candidate = _normalise_marker(self._line)
+            if candidate in self._sections_by_marker:
+                self.current = self._sections_by_marker[candidate]
+            else:
+                self._emit(self._line)
+            self._line = ""
+        return {name: "".join(parts) for name, parts in self.sections.items()}
+
+
+def combined_output_budget(transcript: str) -> Optional[int]:
+    """Output tokens for the combined call on ``transcript``, or None when
+    the models' windows leave too little room to write every artifact."""
+    prompt_tokens = sum(
+        count_tokens(message.content)
+        for message in build_messages(COMBINED_PROMPT, transcript)
+    )
+    return combined_output_tokens(len(SECTION_MARKERS), prompt_tokens)
+
+
+async def run_combined_chain(
+    transcript: str,
+    streams: Optional[dict[str, ArtifactStream]] = None,
+    stats: Optional[dict] = None,
+    max_output_tokens: Optional[int] = None,
+) -> dict[str, str]:
+    """Generate every artifact with a single LLM call.
+
+    Returns ``{artifact: content}``; artifacts the model left out are
+    missing from it. When ``streams`` is given, each artifact's tokens are
+    published to its stream as they arrive. ``max_output_tokens`` should
+    come from ``combined_output_budget``.
+    """
+    messages = build_messages(COMBINED_PROMPT, transcript)
+    streams = streams or {}
+
+    def _route(name: str, text: str) -> None:
+        if name in streams:
+            streams[name].token(text)
+
+    async def _generate(fallback: bool) -> dict[str, str]:
+        splitter = SectionSplitter(SECTION_MARKERS, _route)
+        llm = get_llm(fallback=fallback, max_output_tokens=max_output_tokens)
+        await stream_llm(llm, messages, splitter.feed, stats=stats)
+        return splitter.close()
+
+    def _reset() -> None:
+        for stream in streams.values():
+            stream.reset()
+
+    sections = await run_with_fallback(_generate, on_fallback=_reset)
+    results = {
+        name: _clean_mermaid(text) if name == "flowchart" else fix_markdown(text)
+        for name, text in sections.items()
+        if text.strip()
+    }
+    for name, content in results.items():
+        if name in streams:
+            streams[name].done(content)
+    return results
@@ -2,11 +2,11 @@
 from __future__ import annotations
 
 import re
+from typing import Optional
 
-from langchain_core.messages import HumanMessage
-
-from services.llm_service import get_llm, prepare_transcript
-from chains.prompts import FLOWCHART_PROMPT
+from services.llm_service import get_llm, run_with_fallback, stream_llm
+from services.job_stream import ArtifactStream
+from chains.prompts import FLOWCHART_PROMPT, build_messages
 
 
 def _clean_mermaid(raw: str) -> str:
@@ -19,16 +19,31 @@ def _clean_mermaid(raw: str) -> str:
     return raw.strip()
 
 
-async def run_flowchart_chain(transcript: str) -> str:
-    """Run the flowchart generation chain on a prepared transcript."""
-    prepared = await prepare_transcript(transcript)
-    try:
-        llm = get_llm()
-        prompt = FLOWCHART_PROMPT.format(transcript=prepared)
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
-        return _clean_mermaid(response.content)
-    except Exception:
-        llm = get_llm(fallback=True)
-        prompt = FLOWCHART_PROMPT.format(transcript=prepared)
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
-        return _clean_mermaid(response.content)
+async def run_flowchart_chain(
+    transcript: str,
+    stream: Optional[ArtifactStream] = None,
+    stats: Optional[dict] = None,
+) -> str:
+    """Run the flowchart generation chain on a prepared transcript.
+
+    When ``stream`` is given, tokens are published to it as they arrive;
+    ``stats`` receives the backend's prompt-processing figures.
+    """
+    messages = build_messages(FLOWCHART_PROMPT, transcript)
+    on_token = stream.token if stream else None
+
+    async def _generate(fallback: bool) -> str:
+        return await stream_llm(
+            get_llm(fallback=fallback), messages, on_token,
+            hedge="flowchart", stats=stats,
+        )
+
+    # Skips the primary model while its circuit breaker is open; a failed
+    # primary attempt discards its streamed tokens before the fallback
+    content = await run_with_fallback(
+        _generate, on_fallback=stream.reset if stream else None
+    )
+    result = _clean_mermaid(content)
+    if stream:
+        stream.done(result)
+    return result
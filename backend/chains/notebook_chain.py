@@ -1,23 +1,38 @@
 """Notebook chain — generates interactive code notebook from a transcript."""
 from __future__ import annotations
 
-from langchain_core.messages import HumanMessage
+from typing import Optional
 
-from services.llm_service import get_llm, prepare_transcript
-from chains.prompts import NOTEBOOK_PROMPT
+from services.llm_service import get_llm, run_with_fallback, stream_llm
+from services.job_stream import ArtifactStream
+from chains.prompts import NOTEBOOK_PROMPT, build_messages
 from services.postprocess import fix_markdown
 
 
-async def run_notebook_chain(transcript: str) -> str:
-    """Run the notebook generation chain on a prepared transcript."""
-    prepared = await prepare_transcript(transcript)
-    try:
-        llm = get_llm()
-        prompt = NOTEBOOK_PROMPT.format(transcript=prepared)
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
-        return fix_markdown(response.content)
-    except Exception:
-        llm = get_llm(fallback=True)
-        prompt = NOTEBOOK_PROMPT.format(transcript=prepared)
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
-        return fix_markdown(response.content)
+async def run_notebook_chain(
+    transcript: str,
+    stream: Optional[ArtifactStream] = None,
+    stats: Optional[dict] = None,
+) -> str:
+    """Run the notebook generation chain on a prepared transcript.
+
+    When ``stream`` is given, tokens are published to it as they arrive;
+    ``stats`` receives the backend's prompt-processing figures.
+    """
+    messages = build_messages(NOTEBOOK_PROMPT, transcript)
+    on_token = stream.token if stream else None
+
+    async def _generate(fallback: bool) -> str:
+        return await stream_llm(
+            get_llm(fallback=fallback), messages, on_token, stats=stats
+        )
+
+    # Skips the primary model while its circuit breaker is open; a failed
+    # primary attempt discards its streamed tokens before the fallback
+    content = await run_with_fallback(
+        _generate, on_fallback=stream.reset if stream else None
+    )
+    result = fix_markdown(content)
+    if stream:
+        stream.done(result)
+    return result
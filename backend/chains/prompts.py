@@ -1,7 +1,24 @@
-"""All LLM prompt templates for theory and notebook chains."""
+"""All LLM prompt templates for the theory, notebook and flowchart chains.
+
+Every chain sends the same leading context message holding the transcript,
+followed by its own instructions, so the backend can reuse the processed
+transcript (Ollama's KV cache, OpenAI prompt caching) across the chains.
+"""
+from __future__ import annotations
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+CONTEXT_PROMPT = """\
+You are a teacher turning a coding lecture into study material. The lecture transcript is below; the next message says what to write.
+
+---
+TRANSCRIPT:
+{transcript}
+---
+"""
 
 THEORY_PROMPT = """\
-You are a computer science teacher. Read the lecture transcript below and write a theory page in Markdown format.
+You are a computer science teacher. Using the lecture transcript above, write a theory page in Markdown format.
 
 IMPORTANT FORMATTING RULES:
 - Put a blank line before and after every heading (#, ##, ###).
@@ -40,16 +57,11 @@ Write a table like this:
 
 Write 3-5 bullet points with the most important facts.
 
----
-TRANSCRIPT:
-{transcript}
----
-
 Write ONLY the Markdown content. No preamble. No commentary.
 """
 
 NOTEBOOK_PROMPT = """\
-You are a programming teacher. Read the lecture transcript below and write a code notebook in Markdown format.
+You are a programming teacher. Using the lecture transcript above, write a code notebook in Markdown format.
 
 IMPORTANT FORMATTING RULES:
 - Put a blank line before and after every heading (#, ##, ###).
@@ -124,16 +136,11 @@ State the problem.
 |-----------|--------------|----------------|
 | Empty     | []           | None           |
 
----
-TRANSCRIPT:
-{transcript}
----
-
 Write ONLY the Markdown content. No preamble. No commentary.
 """
 
 FLOWCHART_PROMPT = """\
-You are a computer science teacher. Read the lecture transcript below and produce a Mermaid flowchart diagram that visualises the key concept, algorithm, or process described.
+You are a computer science teacher. Using the lecture transcript above, produce a Mermaid flowchart diagram that visualises the key concept, algorithm, or process described.
 
 RULES:
 - Output ONLY the Mermaid diagram source code. Do NOT include markdown fences (no ```mermaid or ```).
@@ -148,16 +155,44 @@ RULES:
 EXAMPLE OUTPUT:
 flowchart TD
     A[Start] --> B[Read input]
-    B --> C{{Is input valid?}}
+    B --> C{Is input valid?}
     C -- Yes --> D[Process data]
     C -- No --> E[Show error]
     D --> F[Return result]
     E --> B
 
----
-TRANSCRIPT:
-{transcript}
----
-
 Output ONLY the Mermaid diagram. Nothing else.
 """
+
+
+# Marker line that starts each artifact's section in the combined output
+SECTION_MARKERS = {
+    "theory": "<<<THEORY>>>",
+    "notebook": "<<<NOTEBOOK>>>",
+    "flowchart": "<<<FLOWCHART>>>",
+}
+
+COMBINED_PROMPT = f"""\
+Using the lecture transcript above, write three documents one after another: a theory page, a code notebook, then a Mermaid flowchart.
+
+Start each document with its marker on a line of its own, exactly as written here:
+{SECTION_MARKERS["theory"]}
+{SECTION_MARKERS["notebook"]}
+{SECTION_MARKERS["flowchart"]}
+Write nothing before the first marker and nothing after the flowchart.
+
+DOCUMENT 1 — after {SECTION_MARKERS["theory"]}:
+{THEORY_PROMPT}
+DOCUMENT 2 — after {SECTION_MARKERS["notebook"]}:
+{NOTEBOOK_PROMPT}
+DOCUMENT 3 — after {SECTION_MARKERS["flowchart"]}:
+{FLOWCHART_PROMPT}"""
+
+
+def build_messages(instructions: str, transcript: str) -> list[BaseMessage]:
+    """Messages for one chain: the shared transcript context first, then the
+    chain's instructions."""
+    return [
+        SystemMessage(content=CONTEXT_PROMPT.format(transcript=transcript)),
+        HumanMessage(content=instructions),
+    ]
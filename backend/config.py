@@ -27,13 +27,21 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4o"
     openai_base_url: str = ""
 
-    # Transcript
-    max_transcript_tokens: int = 6000
+    # Transcript (the chunking threshold comes from
+    # services/model_capabilities.py, which reads MAX_TRANSCRIPT_TOKENS)
     cache_transcripts: bool = True
 
+    # Chunk summarisation (map stage)
+    summary_concurrency: int = 4
+    summary_max_retries: int = 2
+    summary_reduce_group_size: int = 4
+    summary_max_depth: int = 4
+
     # PDF
-    max_pdf_pages: int = 50
+    max_pdf_pages: int = 200
     max_pdf_size_mb: int = 20
+    pdf_extract_workers: int = 4
+    pdf_pages_per_task: int = 10
 
     # Rate limiting
     rate_limit_per_hour: int = 10
@@ -25,19 +25,88 @@ class Settings(BaseSettings):
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "codellama:13b"
     ollama_fallback_model: str = "codellama:7b"
+    # Comma-separated hosts to balance across; overrides ollama_base_url
+    ollama_base_urls: str = ""
+    ollama_health_check_seconds: float = 15.0
+    ollama_eject_after_failures: int = 3
 
     # OpenAI
     openai_api_key: str = ""
     openai_model: str = "gpt-4o"
     openai_base_url: str = ""
 
-    # Transcript
-    max_transcript_tokens: int = 6000
+    # Model limits; 0 = use the capability registry's value for each model
+    llm_context_tokens: int = 0
+    llm_max_output_tokens: int = 0
+    llm_chunk_tokens: int = 0
+
+    # LLM HTTP connection pool (per backend/model configuration)
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry_seconds: float = 30.0
+
+    # LLM admission control (adaptive concurrency limit per server)
+    ollama_max_concurrency: int = 4
+    openai_max_concurrency: int = 32
+    llm_min_concurrency: int = 1
+    llm_target_latency_seconds: float = 20.0
+
+    # Circuit breaker for the primary model (per model and host)
+    circuit_failure_threshold: int = 3
+    circuit_slow_call_seconds: float = 180.0
+    circuit_reset_seconds: float = 30.0
+
+    # Hedged requests (flowchart chain and chunk summaries)
+    hedge_enabled: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_samples: int = 20
+
+    # "separate" runs one LLM call per artifact; "combined" generates every
+    # artifact in a single call (less prompt evaluation, lower quality)
+    generation_mode: Literal["separate", "combined"] = "separate"
+
+    # Start the other chains once the first has processed the shared
+    # transcript prefix, so they reuse the backend's prompt/KV cache
+    chain_prefix_warmup: bool = True
+
+    # Transcript; chunk above this many tokens (0 = derive from the model's
+    # context window, see services/model_capabilities.py)
+    max_transcript_tokens: int = 0
+    # How tokens are counted for chunking: tiktoken (OpenAI), huggingface
+    # (OLLAMA_TOKENIZER), heuristic (~4 chars per token) or auto
+    token_counter: Literal["auto", "tiktoken", "huggingface", "heuristic"] = "auto"
+    ollama_tokenizer: str = ""
+    token_counter_load_timeout_seconds: float = 10.0
+    # Strip caption noise, filler words and repeats before generation
+    transcript_cleaning: bool = True
     cache_transcripts: bool = True
 
+    # Chunk summarisation (map stage)
+    summary_concurrency: int = 4
+    summary_max_retries: int = 2
+    summary_reduce_group_size: int = 4
+    summary_max_depth: int = 4
+
+    # Result cache
+    result_cache_enabled: bool = True
+    result_cache_ttl_seconds: int = 7 * 24 * 3600
+    result_cache_max_entries: int = 1000
+
     # PDF
-    max_pdf_pages: int = 50
+    max_pdf_pages: int = 200
     max_pdf_size_mb: int = 20
+    pdf_extract_workers: int = 4
+    pdf_pages_per_task: int = 10
+
+    # Uploaded file storage (content-addressed)
+    artifact_dir: str = "./artifacts"
+
+    # Job queue
+    worker_concurrency: int = 2
+    queue_poll_interval_seconds: float = 2.0
+    run_embedded_workers: bool = True
+    worker_lease_seconds: int = 60
+    worker_heartbeat_seconds: int = 15
 
     # Rate limiting
     rate_limit_per_hour: int = 10
@@ -53,11 +122,23 @@ class Settings(BaseSettings):
 
     # Streaming
     enable_streaming: bool = True
+    sse_keepalive_seconds: float = 15.0
+    # How often streams re-read the database when jobs run in standalone
+    # workers, whose updates never reach this process's event bus
+    sse_db_poll_seconds: float = 1.0
+
+    # Response compression (brotli if brotli-asgi is installed, else gzip)
+    compression_min_bytes: int = 1024
 
     @property
     def cors_origins_list(self) -> list[str]:
         return [o.strip() for o in self.cors_origins.split(",") if o.strip()]
 
+    @property
+    def ollama_hosts(self) -> list[str]:
+        hosts = [h.strip().rstrip("/") for h in self.ollama_base_urls.split(",") if h.strip()]
+        return hosts or [self.ollama_base_url.rstrip("/")]
+
 
 @lru_cache
 def get_settings() -> Settings:
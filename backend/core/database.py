@@ -1,15 +1,22 @@
 """SQLAlchemy database setup for SQLite."""
 from __future__ import annotations
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.schema import CreateIndex
 
 from core.config import settings
 
 
+_connect_args = (
+    {"check_same_thread": False}
+    if settings.database_url.startswith("sqlite")
+    else {}
+)
+
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False},
+    connect_args=_connect_args,
     echo=False,
 )
 
@@ -30,6 +37,32 @@ def get_db():
 
 
 def init_db():
-    """Create all tables."""
+    """Create all tables and add any columns missing from older databases."""
     from models.schemas import Job  # noqa: F401 – ensure model is registered
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+
+
+def _add_missing_columns():
+    """Add nullable columns and indexes introduced after a table was first
+    created.
+
+    ``create_all`` never alters existing tables, so databases created by an
+    older version would otherwise fail on the first query touching a new
+    column, or scan the table on lookups by a newly indexed one.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"
+                ))
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
@@ -0,0 +1,163 @@
+"""ASGI middleware shared by the API app."""
+from __future__ import annotations
+
+import json
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class _BodyTooLarge(Exception):
+    """Raised from ``receive`` to stop the app from reading more body."""
+
+
+class BodySizeLimitMiddleware:
+    """Reject request bodies over a per-path limit.
+
+    ``limits`` maps a path to ``(max_bytes, error)``. Requests announcing a
+    larger ``Content-Length`` are refused before any of the body is read,
+    and a malformed one gets 400. Otherwise the body is counted as it
+    streams in and the request is aborted with 413 as soon as the limit is
+    crossed, so oversized bodies are never fully buffered or spooled by the
+    multipart parser.
+    """
+
+    def __init__(self, app: ASGIApp, limits: dict[str, tuple[int, str]]) -> None:
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        max_bytes, error = limit
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None:
+            try:
+                announced = int(content_length)
+            except ValueError:
+                announced = -1
+            if announced < 0:
+                await _reject(send, 400, "Invalid Content-Length header.")
+                return
+            if announced > max_bytes:
+                await _reject(send, 413, error)
+                return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            if exceeded:
+                # The app turned the aborted read into its own error
+                # response; replace it with the 413.
+                if not response_started:
+                    response_started = True
+                    await _reject(send, 413, error)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await _reject(send, 413, error)
+
+
+async def _reject(send: Send, status: int, error: str) -> None:
+    body = json.dumps({"success": False, "data": None, "error": error}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# Content codings the compressor may apply, as suffixed to ETags
+_ETAG_CODINGS = ("br", "gzip")
+
+
+def strip_etag_coding(etag: str) -> str:
+    """Undo the content-coding suffix ``CompressionMiddleware`` adds to ETags."""
+    for coding in _ETAG_CODINGS:
+        suffix = f'-{coding}"'
+        if etag.endswith(suffix):
+            return etag[: -len(suffix)] + '"'
+    return etag
+
+
+class CompressionMiddleware:
+    """Compress responses on the given path prefixes.
+
+    Uses brotli (falling back to gzip for clients that don't accept it) when
+    the optional ``brotli-asgi`` package is installed, gzip otherwise. Only
+    the listed prefixes are wrapped so server-sent event streams are never
+    buffered by the compressor.
+
+    A strong ETag must differ between content codings, so a compressed
+    response's ETag gets the coding appended (``"<tag>-gzip"``); routes
+    comparing If-None-Match strip it with ``strip_etag_coding``.
+    """
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int, paths: tuple[str, ...]
+    ) -> None:
+        self.app = app
+        self.paths = paths
+        try:
+            from brotli_asgi import BrotliMiddleware
+            self.compressed = BrotliMiddleware(
+                app, minimum_size=minimum_size, gzip_fallback=True
+            )
+        except ImportError:
+            from starlette.middleware.gzip import GZipMiddleware
+            self.compressed = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.paths):
+            await self.compressed(scope, receive, _tag_etag_coding(send))
+            return
+        await self.app(scope, receive, send)
+
+
+def _tag_etag_coding(send: Send) -> Send:
+    """Wrap ``send`` to suffix the ETag of an encoded response with its coding."""
+
+    async def tagged_send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = dict(message.get("headers", []))
+            coding = headers.get(b"content-encoding", b"").decode("latin-1")
+            etag = headers.get(b"etag", b"").decode("latin-1")
+            if coding in _ETAG_CODINGS and etag.endswith('"'):
+                headers[b"etag"] = (etag[:-1] + f'-{coding}"').encode("latin-1")
+                message = {
+                    **message,
+                    "headers": [
+                        (key, headers[key] if key == b"etag" else value)
+                        for key, value in message["headers"]
+                    ],
+                }
+        await send(message)
+
+    return tagged_send
@@ -1,24 +1,72 @@
-"""Background job processor — runs in FastAPI BackgroundTasks."""
+"""Background job processor — run by the worker pool for each claimed job."""
 from __future__ import annotations
 
 import asyncio
 import base64
+import functools
 import json
+import logging
+import time
 import traceback
 from datetime import datetime, timezone
+from weakref import WeakValueDictionary
 
+import anyio
+
+from core.config import settings
 from core.database import SessionLocal
-from models.schemas import Job
+from models.schemas import Job, JobArtifact, compute_etag
 from services.transcript_service import get_transcript
-from services.pdf_service import extract_text_from_bytes
-from services.llm_service import prepare_transcript
+from services.transcript_cleaner import clean_transcript, collapse_whitespace
+from services.token_counter import count_tokens
+from services.pdf_service import extract_text_from_bytes, extract_text_parallel
+from services.artifact_store import artifact_path
+from services.llm_service import pin_host, prepare_transcript
+from services import result_cache
+from services.singleflight import LeaderCancelled, get_singleflight
+from services.event_bus import get_event_bus, status_topic
+from services.job_stream import ArtifactStream, discard_job_stream, finish_job_stream
 from chains.theory_chain import run_theory_chain
 from chains.notebook_chain import run_notebook_chain
 from chains.flowchart_chain import run_flowchart_chain
+from chains.combined_chain import combined_output_budget, run_combined_chain
+
+logger = logging.getLogger(__name__)
+
+CHAINS = {
+    "theory": run_theory_chain,
+    "notebook": run_notebook_chain,
+    "flowchart": run_flowchart_chain,
+}
+
+
+# One lock per job with writes in flight, so they run in call order
+_write_locks: WeakValueDictionary[str, asyncio.Lock] = WeakValueDictionary()
+
 
+def _in_thread(fn):
+    """Make the blocking database helper ``fn(job_id, ...)`` awaitable.
 
+    It runs in a worker thread so the event loop, shared with the API's
+    requests, never waits on the database. Calls for the same job run one
+    at a time in the order they were made, so progress never goes backwards
+    and metadata merges don't overwrite each other.
+    """
+    @functools.wraps(fn)
+    async def wrapper(job_id: str, *args, **kwargs):
+        lock = _write_locks.get(job_id)
+        if lock is None:
+            lock = _write_locks[job_id] = asyncio.Lock()
+        async with lock:
+            return await anyio.to_thread.run_sync(
+                functools.partial(fn, job_id, *args, **kwargs)
+            )
+    return wrapper
+
+
+@_in_thread
 def _update_job(job_id: str, **kwargs):
-    """Update a job record in the database."""
+    """Update a job record in the database and notify status subscribers."""
     db = SessionLocal()
     try:
         job = db.query(Job).filter(Job.id == job_id).first()
@@ -27,77 +75,402 @@ def _update_job(job_id: str, **kwargs):
                 setattr(job, k, v)
             job.updated_at = datetime.now(timezone.utc)
             db.commit()
+            get_event_bus().publish(status_topic(job_id), job.status_payload())
     finally:
         db.close()
 
 
+@_in_thread
+def _update_metadata(job_id: str, **fields):
+    """Merge fields into a job's metadata JSON."""
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if job:
+            metadata = json.loads(job.metadata_json) if job.metadata_json else {}
+            metadata.update(fields)
+            job.metadata_json = json.dumps(metadata)
+            job.updated_at = datetime.now(timezone.utc)
+            db.commit()
+            get_event_bus().publish(status_topic(job_id), job.status_payload())
+    finally:
+        db.close()
+
+
+@_in_thread
+def _store_artifact(
+    job_id: str, artifact: str, content: str | None = None, error: str | None = None
+):
+    """Persist one artifact's output (or its failure) as soon as it is known."""
+    db = SessionLocal()
+    try:
+        row = db.get(JobArtifact, (job_id, artifact))
+        if row is None:
+            row = JobArtifact(job_id=job_id, artifact=artifact)
+            db.add(row)
+        row.status = "error" if error else "done"
+        row.set_content(content)
+        row.error_msg = error
+        row.updated_at = datetime.now(timezone.utc)
+        db.commit()
+    finally:
+        db.close()
+
+
+@_in_thread
+def _load_job(job_id: str) -> Job | None:
+    """Return a job's row, detached from its session."""
+    db = SessionLocal()
+    try:
+        return db.query(Job).filter(Job.id == job_id).first()
+    finally:
+        db.close()
+
+
+@_in_thread
+def _load_done_artifacts(job_id: str) -> dict[str, str]:
+    """Return {artifact: content} for the artifacts a job has already finished."""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(JobArtifact)
+            .filter(JobArtifact.job_id == job_id, JobArtifact.status == "done")
+            .all()
+        )
+        return {row.artifact: row.content for row in rows}
+    finally:
+        db.close()
+
+
+def _artifact_states(done, failed=()) -> dict[str, str]:
+    return {
+        name: "done" if name in done else "error" if name in failed else "pending"
+        for name in CHAINS
+    }
+
+
+async def _extract_text(
+    job_id: str, source: str, input_type: str, artifact_hash: str | None
+) -> str:
+    """Return the raw text for a job's input."""
+    if input_type == "youtube":
+        raw_text, video_id = await anyio.to_thread.run_sync(
+            lambda: get_transcript(source, use_cache=True)
+        )
+        return raw_text
+    if input_type == "transcript":
+        return source
+    if input_type == "pdf":
+        if not artifact_hash:
+            # Jobs created before the artifact store, when /api/ingest
+            # accepted PDFs, hold base64 PDF bytes
+            raw_text, _ = await anyio.to_thread.run_sync(
+                extract_text_from_bytes, base64.b64decode(source)
+            )
+            return raw_text
+
+        t_start = time.perf_counter()
+        raw_text, page_texts, page_ms = await extract_text_parallel(
+            artifact_path(artifact_hash)
+        )
+        await _update_metadata(job_id, pdf_extraction={
+            "pages": len(page_texts),
+            "page_ms": page_ms,
+            "total_ms": int((time.perf_counter() - t_start) * 1000),
+        })
+        return raw_text
+    raise ValueError(f"Unknown input_type: {input_type}")
+
+
+async def _clean_text(job_id: str, text: str, input_type: str) -> str:
+    """Drop caption noise before the text is hashed, summarised or prompted."""
+    if not settings.transcript_cleaning:
+        return text
+    t_start = time.perf_counter()
+    # Only auto-captions carry caption noise; pasted transcripts and PDF
+    # text keep their lines and wording, which may be code
+    clean = clean_transcript if input_type == "youtube" else collapse_whitespace
+    cleaned = await anyio.to_thread.run_sync(clean, text)
+    tokens_before, tokens_after = await anyio.to_thread.run_sync(
+        lambda: (count_tokens(text), count_tokens(cleaned))
+    )
+    await _update_metadata(job_id, transcript_cleaning={
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "ms": int((time.perf_counter() - t_start) * 1000),
+    })
+    return cleaned
+
+
+async def _store_result(job_id: str, result: dict):
+    """Mark a job done with its result JSON and the ETag it is served with."""
+    result_json = json.dumps(result)
+    await _update_job(
+        job_id,
+        status="done",
+        progress=100,
+        result_json=result_json,
+        result_etag=compute_etag(result_json),
+    )
+
+
+def _source_preview(source: str) -> str:
+    return source[:200] if len(source) > 200 else source
+
+
+async def _finish_from_cache(job_id: str, source: str, cached_json: str):
+    """Complete a job with a cached result from an identical earlier job."""
+    result = json.loads(cached_json)
+    cached_from = result.get("jobId")
+    result["jobId"] = job_id
+    result["source"] = _source_preview(source)
+    for name in CHAINS:
+        if name in result:
+            await _store_artifact(job_id, name, content=result[name]["content"])
+    await _update_metadata(
+        job_id, cache_hit=True, cached_from=cached_from,
+        artifacts=_artifact_states(result),
+    )
+    await _store_result(job_id, result)
+    finish_job_stream(job_id, "done")
+
+
+async def _generate(
+    job_id: str,
+    raw_text: str | None,
+    prepared: str | None,
+    mode: str,
+    explicit_mode: bool = False,
+) -> dict:
+    """Prepare the text if needed and run every chain; return the artifacts.
+
+    ``explicit_mode`` marks a mode requested for this job rather than the
+    configured default; a combined request that cannot fit then fails the
+    job instead of falling back to separate calls.
+    """
+    if prepared is None:
+        # 3. Prepare once per job — chunk and summarise long inputs a
+        #    single time and share the result with every chain
+        await _update_job(job_id, status="preparing", progress=20)
+
+        async def _on_chunk(done: int, total: int):
+            await _update_job(job_id, progress=20 + (10 * done) // total)
+
+        summary_tree: dict = {}
+        prepared = await prepare_transcript(
+            raw_text, on_progress=_on_chunk, stats=summary_tree
+        )
+        await _update_job(job_id, prepared_text=prepared)
+        await _update_metadata(job_id, summary_tree=summary_tree or None)
+
+    # 4. Process with LLM — a retried job only re-runs the artifacts
+    #    that did not finish last time
+    await _update_job(job_id, status="processing", progress=30)
+    artifacts = await _load_done_artifacts(job_id)
+    errors: dict[str, str] = {}
+    prompt_stats: dict[str, dict] = {}
+    await _update_metadata(job_id, artifacts=_artifact_states(artifacts))
+
+    # Every chain sends the same transcript prefix. The first one runs alone
+    # until the backend has processed that prefix (its first token), then
+    # the rest start and reuse the cached prefix.
+    prefix_ready = asyncio.Event()
+    if not settings.chain_prefix_warmup:
+        prefix_ready.set()
+
+    async def _run(name: str, chain, leader: bool):
+        if not leader:
+            await prefix_ready.wait()
+        stream = ArtifactStream(
+            job_id, name, on_first_token=prefix_ready.set if leader else None
+        )
+        stats: dict = {}
+        try:
+            content = await chain(prepared, stream, stats)
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+            await _store_artifact(
+                job_id, name,
+                error=f"{errors[name]}\n{traceback.format_exc()}",
+            )
+        else:
+            artifacts[name] = content
+            progress = 30 + (50 * len(artifacts)) // len(CHAINS)
+            await _store_artifact(job_id, name, content=content)
+            await _update_job(job_id, progress=progress)
+        finally:
+            if leader:
+                prefix_ready.set()
+        if stats:
+            prompt_stats[name] = stats
+        await _update_metadata(
+            job_id,
+            artifacts=_artifact_states(artifacts, errors),
+            prompt_stats=prompt_stats,
+        )
+
+    async def _run_combined(names: list[str], max_output_tokens: int):
+        streams = {name: ArtifactStream(job_id, name) for name in names}
+        stats: dict = {}
+        try:
+            sections = await run_combined_chain(
+                prepared, streams, stats, max_output_tokens=max_output_tokens
+            )
+        except Exception as e:
+            sections = {}
+            failure = f"{type(e).__name__}: {e}"
+            detail = f"{failure}\n{traceback.format_exc()}"
+        else:
+            failure = detail = None
+        for name in names:
+            if name in sections:
+                artifacts[name] = sections[name]
+                await _store_artifact(job_id, name, content=sections[name])
+                continue
+            errors[name] = failure or (
+                f"ValueError: no {name} section in the combined output"
+            )
+            await _store_artifact(job_id, name, error=detail or errors[name])
+        await _update_job(
+            job_id, progress=30 + (50 * len(artifacts)) // len(CHAINS)
+        )
+        if stats:
+            prompt_stats["combined"] = stats
+        await _update_metadata(
+            job_id,
+            artifacts=_artifact_states(artifacts, errors),
+            prompt_stats=prompt_stats,
+        )
+
+    # Run the remaining chains on one host, store each artifact as soon as
+    # its chain finishes and stream tokens to /api/jobs/{job_id}/stream
+    remaining = [(name, chain) for name, chain in CHAINS.items() if name not in artifacts]
+    if mode == "combined" and len(remaining) > 1:
+        budget = combined_output_budget(prepared)
+        if budget is not None:
+            # One call writes every remaining artifact
+            with pin_host():
+                await _run_combined([name for name, _ in remaining], budget)
+            return {"generatedBy": job_id, "artifacts": artifacts, "errors": errors}
+        reason = (
+            "the transcript leaves too little of the context window to write "
+            "every artifact in one call"
+        )
+        if explicit_mode:
+            raise ValueError(
+                f"generation_mode=combined cannot be used: {reason}; "
+                "use generation_mode=separate"
+            )
+        logger.warning("Job %s: running chains separately, %s", job_id, reason)
+        await _update_metadata(job_id, combined_skipped=reason)
+
+    with pin_host():
+        await asyncio.gather(*(
+            _run(name, chain, leader=(i == 0))
+            for i, (name, chain) in enumerate(remaining)
+        ))
+
+    return {"generatedBy": job_id, "artifacts": artifacts, "errors": errors}
+
+
 async def process_job(job_id: str):
     """Main background task — extracts text, runs LLM chains, stores results."""
     try:
         # 1. Get the job to read its input
-        db = SessionLocal()
-        job = db.query(Job).filter(Job.id == job_id).first()
+        job = await _load_job(job_id)
         if not job:
             return
         source = job.source
         input_type = job.input_type
-        db.close()
+        prepared = job.prepared_text
+        input_hash = job.input_hash
+        artifact_hash = job.artifact_hash
+        mode = job.generation_mode or settings.generation_mode
+        explicit_mode = job.generation_mode is not None
 
-        # 2. Extract text
-        _update_job(job_id, status="extracting", progress=10)
+        raw_text = None
+        if prepared is None:
+            # 2. Extract text
+            await _update_job(job_id, status="extracting", progress=10)
+            raw_text = await _extract_text(job_id, source, input_type, artifact_hash)
+            raw_text = await _clean_text(job_id, raw_text, input_type)
 
-        if input_type == "youtube":
-            import anyio
-            raw_text, video_id = await anyio.to_thread.run_sync(
-                lambda: get_transcript(source, use_cache=True)
+            # Identical input, prompts and model — reuse the earlier result
+            input_hash = await anyio.to_thread.run_sync(
+                result_cache.compute_input_hash, raw_text, mode
             )
-        elif input_type == "transcript":
-            raw_text = source
-        elif input_type == "pdf":
-            # Source contains base64-encoded PDF bytes
-            pdf_bytes = base64.b64decode(source)
-            raw_text, _ = extract_text_from_bytes(pdf_bytes)
-        else:
-            raise ValueError(f"Unknown input_type: {input_type}")
+            await _update_job(job_id, input_hash=input_hash)
+            cached = await anyio.to_thread.run_sync(result_cache.lookup, input_hash)
+            if cached is not None:
+                await _finish_from_cache(job_id, source, cached)
+                return
 
-        # 3. Process with LLM
-        _update_job(job_id, status="processing", progress=30)
+        shared = False
+        if input_hash:
+            # Identical input already being generated — attach to that job
+            flights = get_singleflight()
+            if flights.is_running(input_hash):
+                await _update_job(job_id, status="processing", progress=30)
+            while True:
+                try:
+                    outcome, shared = await flights.do(
+                        input_hash,
+                        lambda: _generate(
+                            job_id, raw_text, prepared, mode, explicit_mode
+                        ),
+                    )
+                    break
+                except LeaderCancelled:
+                    # The job we attached to was cancelled (e.g. its worker
+                    # lost the lease): generate it ourselves, or attach to
+                    # whichever follower got there first
+                    continue
+            if shared:
+                await _update_metadata(job_id, coalesced_with=outcome["generatedBy"])
+        else:
+            outcome = await _generate(job_id, raw_text, prepared, mode, explicit_mode)
 
-        # Run theory, notebook, and flowchart chains concurrently
-        theory_md, notebook_md, flowchart_md = await asyncio.gather(
-            run_theory_chain(raw_text),
-            run_notebook_chain(raw_text),
-            run_flowchart_chain(raw_text),
-        )
+        artifacts, errors = outcome["artifacts"], outcome["errors"]
+        if shared:
+            # Attached to another job's run — keep a copy of its artifacts
+            for name, content in artifacts.items():
+                await _store_artifact(job_id, name, content=content)
+            for name, error in errors.items():
+                await _store_artifact(job_id, name, error=error)
+            await _update_metadata(job_id, artifacts=_artifact_states(artifacts, errors))
 
-        _update_job(job_id, progress=80)
+        if errors:
+            # Finished artifacts stay stored; a retry re-runs only these
+            failed = ", ".join(f"{name} ({error})" for name, error in errors.items())
+            await _update_job(
+                job_id,
+                status="error",
+                error_msg=f"Failed to generate: {failed}",
+            )
+            finish_job_stream(job_id, "error", f"Failed to generate: {failed}")
+            return
 
-        # 4. Build result JSON
+        # 5. Build result JSON
         result = {
             "jobId": job_id,
-            "source": source[:200] if len(source) > 200 else source,
-            "theory": {
-                "content": theory_md,
-            },
-            "notebook": {
-                "content": notebook_md,
-            },
-            "flowchart": {
-                "content": flowchart_md,
-            },
+            "source": _source_preview(source),
+            **{name: {"content": artifacts[name]} for name in CHAINS},
         }
 
-        # 5. Store result and mark done
-        _update_job(
-            job_id,
-            status="done",
-            progress=100,
-            result_json=json.dumps(result),
-        )
+        # 6. Store result and mark done
+        await _store_result(job_id, result)
+        finish_job_stream(job_id, "done")
+        if input_hash and not shared:
+            await anyio.to_thread.run_sync(result_cache.store, input_hash, job_id)
 
     except Exception as e:
-        _update_job(
+        await _update_job(
             job_id,
             status="error",
             error_msg=f"{type(e).__name__}: {str(e)}\n{traceback.format_exc()}",
         )
+        finish_job_stream(job_id, "error", f"{type(e).__name__}: {e}")
+    finally:
+        # A cancelled job (lost lease, shutdown) never reaches
+        # finish_job_stream; don't keep its tokens for the process lifetime
+        discard_job_stream(job_id)
@@ -0,0 +1,131 @@
+"""Database-backed job queue — pending rows in ``jobs`` are the queue.
+
+Workers lease the jobs they claim and renew the lease with a heartbeat
+while processing. A job whose lease has expired belongs to a dead worker
+and can be claimed again by anyone.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, or_
+
+from core.config import settings
+from core.database import SessionLocal
+from models.schemas import Job
+
+# Statuses a job passes through while a worker owns it
+ACTIVE_STATUSES = ("extracting", "preparing", "processing")
+
+
+def new_worker_id() -> str:
+    """Return an id unique to this worker process across hosts."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _lease_expired(now: datetime):
+    """Filter for active jobs whose worker stopped heartbeating."""
+    return and_(
+        Job.status.in_(ACTIVE_STATUSES),
+        or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < now),
+    )
+
+
+def claim_next_job(worker_id: str) -> Optional[str]:
+    """Atomically claim the oldest claimable job and return its id.
+
+    Pending jobs and jobs with an expired lease are claimable. The claim is a
+    conditional UPDATE that re-checks the same condition, so when several
+    workers race for a row only one of them sees a match.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        claimable = or_(Job.status == "pending", _lease_expired(now))
+        candidates = (
+            db.query(Job.id)
+            .filter(claimable)
+            .order_by(Job.created_at)
+            .limit(10)
+            .all()
+        )
+        for (job_id,) in candidates:
+            claimed = (
+                db.query(Job)
+                .filter(Job.id == job_id, claimable)
+                .update(
+                    {
+                        "status": "extracting",
+                        "progress": 10,
+                        "worker_id": worker_id,
+                        "heartbeat_at": now,
+                        "lease_expires_at": now + timedelta(
+                            seconds=settings.worker_lease_seconds
+                        ),
+                        "updated_at": now,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            if claimed:
+                return job_id
+        return None
+    finally:
+        db.close()
+
+
+def renew_lease(job_id: str, worker_id: str) -> bool:
+    """Extend the lease on a job; False if another worker has taken it over."""
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        renewed = (
+            db.query(Job)
+            .filter(Job.id == job_id, Job.worker_id == worker_id)
+            .update(
+                {
+                    "heartbeat_at": now,
+                    "lease_expires_at": now + timedelta(
+                        seconds=settings.worker_lease_seconds
+                    ),
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return bool(renewed)
+    finally:
+        db.close()
+
+
+def requeue_interrupted_jobs() -> int:
+    """Put jobs abandoned by a crashed or restarted worker back in the queue.
+
+    Only jobs whose lease has expired are touched, so jobs that live workers
+    in other processes are still heartbeating keep running.
+    """
+    db = SessionLocal()
+    try:
+        count = (
+            db.query(Job)
+            .filter(_lease_expired(datetime.now(timezone.utc)))
+            .update(
+                {
+                    "status": "pending",
+                    "progress": 0,
+                    "worker_id": None,
+                    "lease_expires_at": None,
+                    "updated_at": datetime.now(timezone.utc),
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return count
+    finally:
+        db.close()
@@ -0,0 +1,82 @@
+"""Standalone worker process — ``python -m jobs.worker``.
+
+Pulls pending jobs from the shared database and runs ``process_job`` on
+them, independently of the API process. Run as many of these as needed,
+on this host or others pointing at the same DATABASE_URL, and set
+RUN_EMBEDDED_WORKERS=false on the API to keep it free of LLM work.
+Workers read uploaded PDFs from ARTIFACT_DIR, so on other hosts it must be
+a filesystem shared with the API.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+
+from core.config import settings
+from core.database import init_db
+from jobs.queue import requeue_interrupted_jobs
+from jobs.worker_pool import WorkerPool
+from services.pdf_service import shutdown_extract_pool
+from services.llm_clients import get_client_registry
+from services.ollama_hosts import get_host_pool
+from services.token_counter import init_token_counter
+
+logger = logging.getLogger("jobs.worker")
+
+
+async def _serve(pool: WorkerPool) -> None:
+    await init_token_counter()
+    hosts = get_host_pool()
+    if settings.llm_backend == "ollama":
+        hosts.start()
+    try:
+        await pool.run_forever()
+    finally:
+        await hosts.stop()
+        await get_client_registry().aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lecture2Code job worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.worker_concurrency,
+        help="Jobs processed at once by this worker process",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=settings.log_level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    init_db()
+    if not os.path.isdir(settings.artifact_dir):
+        logger.warning(
+            "ARTIFACT_DIR %s does not exist; PDF jobs will fail unless it is "
+            "the API's upload directory", os.path.abspath(settings.artifact_dir),
+        )
+    requeued = requeue_interrupted_jobs()
+
+    pool = WorkerPool(
+        size=args.concurrency,
+        poll_interval=settings.queue_poll_interval_seconds,
+        heartbeat_interval=settings.worker_heartbeat_seconds,
+    )
+    logger.info(
+        "Worker %s started (concurrency=%d, requeued=%d)",
+        pool.worker_id, args.concurrency, requeued,
+    )
+    try:
+        asyncio.run(_serve(pool))
+    except KeyboardInterrupt:
+        logger.info("Worker %s stopped", pool.worker_id)
+    finally:
+        shutdown_extract_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Fixed-size async worker pool that drains the job queue."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+import anyio
+
+from core.config import settings
+from jobs.queue import claim_next_job, new_worker_id, renew_lease
+from jobs.process_job import process_job
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """Runs ``size`` workers on the current event loop.
+
+    Each worker claims one pending job at a time and runs ``process_job`` on
+    it, heartbeating the job's lease every ``heartbeat_interval`` seconds.
+    A job whose lease is lost to another worker is cancelled here, so the
+    two never write the same job. Queue and lease queries run in worker
+    threads, keeping the event loop free for the API requests sharing it.
+    Workers wake up when ``notify()`` is called after a job is enqueued, and
+    otherwise poll the queue every ``poll_interval`` seconds so jobs added by
+    other processes are picked up too.
+    """
+
+    def __init__(
+        self, size: int, poll_interval: float, heartbeat_interval: float
+    ) -> None:
+        self._size = max(1, size)
+        self._poll_interval = poll_interval
+        self._heartbeat_interval = heartbeat_interval
+        self.worker_id = new_worker_id()
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self._size)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers because a new job is waiting."""
+        self._wakeup.set()
+
+    async def run_forever(self) -> None:
+        """Start the workers and block until they are cancelled."""
+        self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            try:
+                job_id = await anyio.to_thread.run_sync(
+                    claim_next_job, self.worker_id
+                )
+            except Exception:
+                logger.exception("Worker %d failed to claim a job", index)
+                job_id = None
+
+            if job_id is None:
+                await self._wait_for_work()
+                continue
+
+            job = asyncio.create_task(process_job(job_id), name=f"job-{job_id}")
+            heartbeat = asyncio.create_task(self._heartbeat(job_id, job))
+            try:
+                await job
+            except asyncio.CancelledError:
+                # Only stop() cancels the worker itself; a cancelled job
+                # (e.g. by the heartbeat after losing its lease) is not fatal
+                if asyncio.current_task().cancelling():
+                    raise
+                if heartbeat.done() and not heartbeat.cancelled():
+                    logger.warning("Abandoned job %s after losing its lease", job_id)
+                else:
+                    logger.warning("Job %s was cancelled", job_id)
+            except Exception:
+                logger.exception("Worker %d failed on job %s", index, job_id)
+            finally:
+                heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str, job: asyncio.Task) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            try:
+                renewed = await anyio.to_thread.run_sync(
+                    renew_lease, job_id, self.worker_id
+                )
+                if not renewed:
+                    logger.warning("Lost lease on job %s; cancelling it", job_id)
+                    job.cancel()
+                    return
+            except Exception:
+                logger.exception("Heartbeat for job %s failed", job_id)
+
+    async def _wait_for_work(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+
+# Module-level singleton — created on first use inside the running loop
+_pool: Optional[WorkerPool] = None
+
+
+def get_worker_pool() -> WorkerPool:
+    global _pool
+    if _pool is None:
+        _pool = WorkerPool(
+            size=settings.worker_concurrency,
+            poll_interval=settings.queue_poll_interval_seconds,
+            heartbeat_interval=settings.worker_heartbeat_seconds,
+        )
+    return _pool
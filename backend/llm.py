@@ -1,75 +1,188 @@
 from __future__ import annotations
 
+import asyncio
+from typing import Awaitable, Callable, Optional, TypeVar
+
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import HumanMessage
 
 from config import settings
+from services.llm_clients import get_client_registry
+from services.llm_limiter import limited_ainvoke, limited_astream
+from services.ollama_hosts import get_host_pool
+from services.circuit_breaker import call_with_breaker
+from services.model_capabilities import (
+    get_capabilities,
+    summary_chunk_tokens,
+    transcript_token_limit,
+)
+from services.token_counter import count_tokens, get_token_counter
+
+T = TypeVar("T")
 
 
 def get_llm(fallback: bool = False) -> BaseChatModel:
-    """Return the configured LLM instance."""
+    """Return the configured LLM instance, backed by a pooled long-lived client."""
+    registry = get_client_registry()
     if settings.llm_backend == "openai":
-        from langchain_openai import ChatOpenAI
-        
         # Check if we should use a custom base URL (e.g. for OpenRouter)
         base_url = settings.openai_base_url or None
         if not base_url and settings.openai_api_key.startswith("sk-or-v1-"):
              base_url = "https://openrouter.ai/api/v1"
 
-        return ChatOpenAI(
-            model=settings.openai_model,
+        return registry.get(
+            "openai",
+            settings.openai_model,
             temperature=0.2,
+            max_tokens=get_capabilities(settings.openai_model).max_output_tokens,
             api_key=settings.openai_api_key,
             base_url=base_url
         )
     else:
-        from langchain_ollama import ChatOllama
         model = settings.ollama_fallback_model if fallback else settings.ollama_model
-        return ChatOllama(
-            model=model,
-            base_url=settings.ollama_base_url,
+        caps = get_capabilities(model)
+        return registry.get(
+            "ollama",
+            model,
+            base_url=get_host_pool().pick(),
             temperature=0.2,
-            num_predict=4096,
-            num_ctx=8192,
+            num_predict=caps.max_output_tokens,
+            num_ctx=caps.context_tokens,
             repeat_penalty=1.1,
             top_p=0.9,
         )
 
 
+def _primary_model() -> str:
+    if settings.llm_backend == "openai":
+        return f"openai:{settings.openai_model}"
+    return f"ollama:{settings.ollama_model}"
+
+
+async def run_with_fallback(
+    call: Callable[[bool], Awaitable[T]],
+    on_fallback: Optional[Callable[[], None]] = None,
+) -> T:
+    """Run call(fallback) on the primary model through its circuit breaker,
+    falling back to call(True) while it is open or on failure."""
+    return await call_with_breaker(_primary_model(), call, on_fallback)
+
+
 def _needs_chunking(text: str) -> bool:
-    approx_tokens = len(text) // 4
-    return approx_tokens > settings.max_transcript_tokens
+    return count_tokens(text) > transcript_token_limit()
+
+
+_CHUNK_PROMPT = (
+    "Summarise the following section of a coding lecture transcript. "
+    "Preserve all technical details, algorithms, code patterns, and examples:\n\n"
+)
 
+_REDUCE_PROMPT = (
+    "The following are summaries of consecutive sections of a coding lecture. "
+    "Combine them into a single summary in the same order. "
+    "Preserve all technical details, algorithms, code patterns, and examples:\n\n"
+)
 
-async def chunk_and_summarise(transcript: str) -> str:
+
+async def _summarise(instruction: str, text: str) -> str:
+    """Summarise one piece of text, retrying transient failures with backoff.
+
+    The model is fetched per attempt so every call, retries included, is
+    routed to the least-loaded host.
+    """
+    prompt = f"{instruction}{text}"
+    for attempt in range(settings.summary_max_retries + 1):
+        try:
+            response = await limited_ainvoke(get_llm(), [HumanMessage(content=prompt)])
+            return response.content
+        except Exception:
+            if attempt == settings.summary_max_retries:
+                raise
+            await asyncio.sleep(2 ** attempt)
+
+
+async def _reduce_summaries(
+    summaries: list[str],
+    semaphore: asyncio.Semaphore,
+    stats: dict,
+) -> str:
+    """Re-summarise groups of summaries until the joined text fits the budget."""
+    group_size = max(2, settings.summary_reduce_group_size)
+    joined = "\n\n".join(summaries)
+    while (
+        _needs_chunking(joined)
+        and len(summaries) > 1
+        and stats["depth"] < settings.summary_max_depth
+    ):
+        groups = [
+            "\n\n".join(summaries[i:i + group_size])
+            for i in range(0, len(summaries), group_size)
+        ]
+
+        async def _run(group: str) -> str:
+            async with semaphore:
+                return await _summarise(_REDUCE_PROMPT, group)
+
+        summaries = list(await asyncio.gather(*(_run(g) for g in groups)))
+        stats["depth"] += 1
+        stats["fan_out"].append(len(summaries))
+        joined = "\n\n".join(summaries)
+    return joined
+
+
+async def chunk_and_summarise(
+    transcript: str,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    stats: Optional[dict] = None,
+) -> str:
     """
     Split the transcript into overlapping chunks, summarise each with the LLM,
-    then join the summaries. Used when transcript exceeds MAX_TRANSCRIPT_TOKENS.
+    then join the summaries. Used when the transcript exceeds the model's
+    transcript token limit (see services/model_capabilities.py).
+
+    Chunks are summarised concurrently, at most SUMMARY_CONCURRENCY at a time,
+    and kept in their original order. If the joined summaries are still over
+    the limit they are reduced again in groups of SUMMARY_REDUCE_GROUP_SIZE
+    until they fit. on_progress(done, total) is called as each chunk finishes;
+    stats, if given, receives the tree shape (chunks, depth, fan_out).
     """
+    chunk_tokens = summary_chunk_tokens()
     splitter = RecursiveCharacterTextSplitter(
-        chunk_size=2000 * 4,   # characters ~ 2000 tokens
-        chunk_overlap=200 * 4,
-        length_function=len,
+        chunk_size=chunk_tokens,
+        chunk_overlap=chunk_tokens // 10,
+        length_function=get_token_counter().count,
     )
     chunks = splitter.split_text(transcript)
 
-    llm = get_llm()
-    summaries: list[str] = []
-    for chunk in chunks:
-        prompt = (
-            "Summarise the following section of a coding lecture transcript. "
-            "Preserve all technical details, algorithms, code patterns, and examples:\n\n"
-            f"{chunk}"
-        )
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
-        summaries.append(response.content)
+    semaphore = asyncio.Semaphore(max(1, settings.summary_concurrency))
+    done = 0
+
+    async def _run(chunk: str) -> str:
+        nonlocal done
+        async with semaphore:
+            summary = await _summarise(_CHUNK_PROMPT, chunk)
+        done += 1
+        if on_progress:
+            on_progress(done, len(chunks))
+        return summary
 
-    return "\n\n".join(summaries)
+    summaries = await asyncio.gather(*(_run(chunk) for chunk in chunks))
 
+    if stats is None:
+        stats = {}
+    stats.update(chunks=len(chunks), depth=1, fan_out=[len(chunks)])
+    return await _reduce_summaries(list(summaries), semaphore, stats)
 
-async def prepare_transcript(raw_transcript: str) -> str:
+
+async def prepare_transcript(
+    raw_transcript: str,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    stats: Optional[dict] = None,
+) -> str:
     """Return the transcript ready for LLM chains, chunking if needed."""
     if _needs_chunking(raw_transcript):
-        return await chunk_and_summarise(raw_transcript)
+        return await chunk_and_summarise(
+            raw_transcript, on_progress=on_progress, stats=stats
+        )
     return raw_transcript
@@ -8,16 +8,40 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from core.config import settings
 from core.database import init_db
+from core.middleware import BodySizeLimitMiddleware, CompressionMiddleware
+from jobs.queue import requeue_interrupted_jobs
+from jobs.worker_pool import get_worker_pool
+from services.pdf_service import shutdown_extract_pool
+from services.llm_clients import get_client_registry
+from services.llm_limiter import limiter_stats
+from services.ollama_hosts import get_host_pool
+from services.circuit_breaker import breaker_stats
+from services.hedging import hedge_stats
+from services.result_cache import cache_stats
+from services.token_counter import init_token_counter
 from api.routes.ingest import router as ingest_router
 from api.routes.status import router as status_router
 from api.routes.results import router as results_router
+from api.routes.jobs import router as jobs_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """Initialize database, re-queue interrupted jobs and run the worker pool."""
     init_db()
+    requeue_interrupted_jobs()
+    await init_token_counter()
+    pool = get_worker_pool()
+    hosts = get_host_pool()
+    if settings.llm_backend == "ollama":
+        hosts.start()
+    if settings.run_embedded_workers:
+        pool.start()
     yield
+    await pool.stop()
+    await hosts.stop()
+    await get_client_registry().aclose()
+    shutdown_extract_pool()
 
 
 app = FastAPI(
@@ -27,7 +51,33 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# CORS
+# Abort oversized ingest bodies while they stream in. The PDF route enforces
+# the exact file-size limit, this adds headroom for multipart framing; JSON
+# bodies (URLs and pasted transcripts) get the same limit
+_MAX_BODY_BYTES = settings.max_pdf_size_mb * 1024 * 1024 + 64 * 1024
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        "/api/ingest/pdf": (
+            _MAX_BODY_BYTES,
+            f"PDF file exceeds {settings.max_pdf_size_mb}MB limit.",
+        ),
+        "/api/ingest": (
+            _MAX_BODY_BYTES,
+            f"Request body exceeds {settings.max_pdf_size_mb}MB limit.",
+        ),
+    },
+)
+
+# Compress result payloads; event streams are left alone
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_bytes,
+    paths=("/api/results/",),
+)
+
+# CORS — added last so it is the outermost middleware and the replies of
+# the middleware above (e.g. 413 from the size limit) get CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
@@ -40,12 +90,24 @@ app.add_middleware(
 app.include_router(ingest_router)
 app.include_router(status_router)
 app.include_router(results_router)
+app.include_router(jobs_router)
 
 
 @app.get("/health")
 async def health():
     return {
         "success": True,
-        "data": {"status": "ok", "version": "2.0.0"},
+        "data": {
+            "status": "ok",
+            "version": "2.0.0",
+            "result_cache": cache_stats(),
+            "llm_clients": get_client_registry().stats(),
+            "llm_limiters": limiter_stats(),
+            "circuit_breakers": breaker_stats(),
+            "hedging": hedge_stats(),
+            "ollama_hosts": (
+                get_host_pool().stats() if settings.llm_backend == "ollama" else None
+            ),
+        },
         "error": None,
     }
@@ -1,6 +1,8 @@
 """SQLAlchemy models and Pydantic schemas."""
 from __future__ import annotations
 
+import hashlib
+import json
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Optional
@@ -13,6 +15,11 @@ from core.database import Base
 
 # ── SQLAlchemy ORM Model ─────────────────────────────────────────────────────
 
+def compute_etag(body: str) -> str:
+    """Strong ETag for a serialised response body."""
+    return '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+
+
 class Job(Base):
     __tablename__ = "jobs"
 
@@ -21,12 +28,71 @@ class Job(Base):
     progress = Column(Integer, nullable=False, default=0)
     source = Column(String, nullable=False)
     input_type = Column(String, nullable=False)
+    artifact_hash = Column(String, nullable=True)
+    prepared_text = Column(Text, nullable=True)
     result_json = Column(Text, nullable=True)
+    result_etag = Column(String, nullable=True)
     error_msg = Column(Text, nullable=True)
+    metadata_json = Column(Text, nullable=True)
+    input_hash = Column(String, nullable=True, index=True)
+    generation_mode = Column(String, nullable=True)
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc))
+
+    def status_payload(self) -> dict:
+        """Status fields returned by the status endpoint and event stream."""
+        return {
+            "status": self.status,
+            "progress": self.progress,
+            "error": self.error_msg,
+            "metadata": json.loads(self.metadata_json) if self.metadata_json else {},
+        }
+
+
+class ResultCacheEntry(Base):
+    """Maps a content hash to the job whose result answers it."""
+    __tablename__ = "result_cache"
+
+    key = Column(String, primary_key=True)
+    job_id = Column(String, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    last_hit_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class JobArtifact(Base):
+    """One generated artifact (theory, notebook or flowchart) of a job."""
+    __tablename__ = "job_artifacts"
+
+    job_id = Column(String, primary_key=True)
+    artifact = Column(String, primary_key=True)
+    status = Column(String, nullable=False)
+    content = Column(Text, nullable=True)
+    payload_json = Column(Text, nullable=True)
+    etag = Column(String, nullable=True)
+    error_msg = Column(Text, nullable=True)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc),
                         onupdate=lambda: datetime.now(timezone.utc))
 
+    def set_content(self, content: Optional[str]):
+        """Store the content with its serialised response body and ETag, so
+        the artifact endpoint can serve it as-is."""
+        self.content = content
+        if content is None:
+            self.payload_json = None
+            self.etag = None
+            return
+        self.payload_json = json.dumps({
+            "jobId": self.job_id,
+            "artifact": self.artifact,
+            "content": content,
+        })
+        self.etag = compute_etag(self.payload_json)
+
 
 # ── Pydantic Request / Response Schemas ──────────────────────────────────────
 
@@ -35,6 +101,11 @@ class IngestRequest(BaseModel):
     input_type: str = Field(..., pattern="^(youtube|pdf|transcript)$",
                             description="One of: youtube, pdf, transcript")
     content: Optional[str] = Field(None, description="Raw transcript text (for input_type=transcript)")
+    generation_mode: Optional[str] = Field(
+        None, pattern="^(separate|combined)$",
+        description="separate (one LLM call per artifact) or combined (one call for all); "
+                    "defaults to GENERATION_MODE",
+    )
 
 
 class ApiEnvelope(BaseModel):
@@ -51,6 +122,7 @@ class StatusResponse(BaseModel):
     status: str
     progress: int
     error: Optional[str] = None
+    metadata: dict = Field(default_factory=dict)
 
 
 class ResultResponse(BaseModel):
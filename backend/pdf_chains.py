@@ -5,7 +5,7 @@ import asyncio
 
 from langchain_core.messages import HumanMessage
 
-from llm import get_llm, prepare_transcript
+from llm import get_llm, limited_ainvoke, prepare_transcript, run_with_fallback
 from postprocess import fix_markdown
 
 
@@ -115,14 +115,14 @@ Answer the question based ONLY on the document above.
 
 async def _run_pdf_chain(prompt_template: str, text: str, **kwargs) -> str:
     """Run a single LLM chain with the given prompt and text."""
-    llm = get_llm()
     prompt = prompt_template.format(text=text, **kwargs)
-    try:
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
-    except Exception:
-        # Fallback to lighter model
-        llm = get_llm(fallback=True)
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
+
+    async def _invoke(fallback: bool):
+        # Fallback is the lighter model
+        llm = get_llm(fallback=fallback)
+        return await limited_ainvoke(llm, [HumanMessage(content=prompt)])
+
+    response = await run_with_fallback(_invoke)
     return fix_markdown(response.content)
 
 
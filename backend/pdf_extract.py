@@ -5,6 +5,8 @@ a configurable page limit.
 """
 from __future__ import annotations
 
+import os
+
 import fitz  # PyMuPDF
 from config import settings
 
@@ -27,14 +29,15 @@ def extract_text_from_bytes(pdf_bytes: bytes) -> tuple[str, list[str]]:
     except Exception as exc:
         raise PDFExtractionError(f"Could not open PDF: {exc}") from exc
 
-    if doc.page_count > settings.max_pdf_pages:
+    page_count = doc.page_count
+    if page_count > settings.max_pdf_pages:
         doc.close()
         raise PDFExtractionError(
-            f"PDF has {doc.page_count} pages, which exceeds the "
+            f"PDF has {page_count} pages, which exceeds the "
             f"limit of {settings.max_pdf_pages}."
         )
 
-    if doc.page_count == 0:
+    if page_count == 0:
         doc.close()
         raise PDFExtractionError("PDF has no pages.")
 
@@ -52,3 +55,22 @@ def extract_text_from_bytes(pdf_bytes: bytes) -> tuple[str, list[str]]:
         )
 
     return full_text, page_texts
+
+
+async def extract_text_parallel(path: str | os.PathLike) -> tuple[str, list[str], list[float]]:
+    """Extract text off the event loop, splitting pages across a process pool.
+
+    Returns:
+        (full_text, list_of_page_texts, per_page_extraction_ms)
+
+    Raises:
+        PDFExtractionError: if the file cannot be read or exceeds page limit.
+    """
+    from services import pdf_service
+
+    try:
+        return await pdf_service.extract_text_parallel(
+            path, max_pages=settings.max_pdf_pages
+        )
+    except pdf_service.PDFExtractionError as exc:
+        raise PDFExtractionError(str(exc)) from exc
@@ -9,10 +9,13 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from config import settings
-from pdf_extract import extract_text_from_bytes, PDFExtractionError
+from pdf_extract import extract_text_parallel, PDFExtractionError
 from pdf_chains import run_pdf_chains, run_pdf_qa
 from session import get_session_store
 from llm import _needs_chunking
+from services.singleflight import get_singleflight, make_key
+from services.token_counter import count_tokens
+from services.upload_service import UploadTooLargeError, spool_upload
 
 limiter = Limiter(key_func=get_remote_address)
 
@@ -36,39 +39,47 @@ async def pdf_process(
             content={"detail": "Only PDF files are accepted."},
         )
 
-    # Read file bytes
-    pdf_bytes = await file.read()
+    model = (
+        settings.ollama_model
+        if settings.llm_backend == "ollama"
+        else settings.openai_model
+    )
     max_bytes = settings.max_pdf_size_mb * 1024 * 1024
-    if len(pdf_bytes) > max_bytes:
+    t_start = time.time()
+
+    try:
+        # Stream the upload to a temp file in chunks, hashing it and
+        # rejecting it as soon as it exceeds the size limit
+        async with spool_upload(file, max_bytes) as spooled:
+
+            async def _extract_and_summarise() -> tuple[str, list[str], list[float], str, str]:
+                full_text, page_texts, page_ms = await extract_text_parallel(spooled.path)
+                summary, points = await run_pdf_chains(full_text)
+                return full_text, page_texts, page_ms, summary, points
+
+            # Extract text and run LLM chains; identical uploads already
+            # being processed share one run
+            key = make_key("pdf", settings.llm_backend, model, spooled.sha256)
+            (full_text, page_texts, page_ms, summary, points), coalesced = (
+                await get_singleflight().do(key, _extract_and_summarise)
+            )
+    except UploadTooLargeError:
         return JSONResponse(
-            status_code=400,
+            status_code=413,
             content={
                 "detail": f"PDF exceeds the {settings.max_pdf_size_mb} MB size limit."
             },
         )
-
-    # Extract text
-    try:
-        full_text, page_texts = extract_text_from_bytes(pdf_bytes)
     except PDFExtractionError as exc:
         return JSONResponse(status_code=422, content={"detail": str(exc)})
 
-    t_start = time.time()
-
-    # Run LLM chains
-    summary, points = await run_pdf_chains(full_text)
-
-    approx_tokens = len(full_text) // 4
-    model = (
-        settings.ollama_model
-        if settings.llm_backend == "ollama"
-        else settings.openai_model
-    )
     metadata = {
         "filename": file.filename,
         "page_count": len(page_texts),
-        "text_token_count": approx_tokens,
+        "page_extraction_ms": page_ms,
+        "text_token_count": count_tokens(full_text),
         "chunked": _needs_chunking(full_text),
+        "coalesced": coalesced,
         "llm_backend": settings.llm_backend,
         "model": model,
         "processing_time_ms": int((time.time() - t_start) * 1000),
@@ -1,3 +1,4 @@
+import asyncio
 import time
 from typing import Optional, AsyncIterator, Tuple, Any
 
@@ -9,8 +10,11 @@ from sse_starlette.sse import EventSourceResponse
 from chains import run_chains, stream_theory_chain, stream_notebook_chain, prepare_transcript
 from postprocess import fix_markdown
 from session import get_session_store
-from transcript import get_transcript, approximate_token_count
+from transcript import get_transcript
 from config import settings
+from services.model_capabilities import transcript_token_limit
+from services.token_counter import count_tokens
+from services.singleflight import get_singleflight, make_key
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
@@ -51,18 +55,24 @@ async def process(request: Request, body: ProcessRequest = Body(...)) -> JSONRes
     t_start = time.time()
 
     raw_transcript, video_id, _ = await _resolve_transcript(body)
-    token_count = approximate_token_count(raw_transcript)
-    chunked = (token_count > settings.max_transcript_tokens)
-
-    theory, notebook = await run_chains(raw_transcript)
+    token_count = count_tokens(raw_transcript)
+    chunked = token_count > transcript_token_limit()
 
     model = (
         settings.ollama_model if settings.llm_backend == "ollama" else settings.openai_model
     )
+
+    # Identical transcripts already being processed share one run
+    key = make_key("process", settings.llm_backend, model, " ".join(raw_transcript.split()))
+    (theory, notebook), coalesced = await get_singleflight().do(
+        key, lambda: run_chains(raw_transcript)
+    )
+
     metadata = {
         "video_id": video_id,
         "transcript_token_count": token_count,
         "chunked": chunked,
+        "coalesced": coalesced,
         "llm_backend": settings.llm_backend,
         "model": model,
         "processing_time_ms": int((time.time() - t_start) * 1000),
@@ -86,21 +96,43 @@ async def process(request: Request, body: ProcessRequest = Body(...)) -> JSONRes
 async def process_stream(request: Request, body: ProcessRequest = Body(...)) -> EventSourceResponse:
     t_start = time.time()
     raw_transcript, video_id, _ = await _resolve_transcript(body)
-    token_count = approximate_token_count(raw_transcript)
-    chunked = token_count > settings.max_transcript_tokens
+    token_count = count_tokens(raw_transcript)
+    chunked = token_count > transcript_token_limit()
     prepared = await prepare_transcript(raw_transcript)
 
     async def _event_generator() -> AsyncIterator[dict]:
         theory_buf: list[str] = []
         notebook_buf: list[str] = []
-
-        async for token in stream_theory_chain(prepared):
-            theory_buf.append(token)
-            yield {"event": "theory_token", "data": token}
-
-        async for token in stream_notebook_chain(prepared):
-            notebook_buf.append(token)
-            yield {"event": "notebook_token", "data": token}
+        buffers = {"theory_token": theory_buf, "notebook_token": notebook_buf}
+
+        # Consume both streams concurrently and multiplex their tokens into
+        # the response in arrival order
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        async def _pump(event: str, stream: AsyncIterator[str]) -> None:
+            try:
+                async for token in stream:
+                    queue.put_nowait((event, token))
+            finally:
+                queue.put_nowait((event, finished))
+
+        pumps = [
+            asyncio.create_task(_pump("theory_token", stream_theory_chain(prepared))),
+            asyncio.create_task(_pump("notebook_token", stream_notebook_chain(prepared))),
+        ]
+        try:
+            remaining = len(pumps)
+            while remaining:
+                event, token = await queue.get()
+                if token is finished:
+                    remaining -= 1
+                    continue
+                buffers[event].append(token)
+                yield {"event": event, "data": token}
+        finally:
+            for pump in pumps:
+                pump.cancel()
 
         # Post-process the accumulated content for the saved session
         theory = fix_markdown("".join(theory_buf))
@@ -0,0 +1,57 @@
+"""Content-addressed on-disk store for uploaded files.
+
+Files are stored once under ``artifact_dir`` by their SHA-256 digest
+(``<dir>/<first two hex chars>/<digest>``). Jobs keep only the digest, and
+readers open the file by path instead of loading a copy of the payload
+into every row read.
+
+The API process writes uploads here and workers read them, so workers on
+other hosts need ``artifact_dir`` on a shared filesystem (e.g. NFS).
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from core.config import settings
+
+
+class ArtifactNotFoundError(Exception):
+    """Raised when a referenced artifact is missing from the store."""
+
+
+def _root() -> Path:
+    return Path(settings.artifact_dir)
+
+
+def artifact_path(digest: str) -> Path:
+    """Return the path of a stored artifact, raising if it does not exist."""
+    path = _root() / digest[:2] / digest
+    if not path.is_file():
+        raise ArtifactNotFoundError(
+            f"Artifact {digest} not found under {_root().resolve()}; workers "
+            "on other hosts need ARTIFACT_DIR on a filesystem shared with the API"
+        )
+    return path
+
+
+def staging_dir() -> Path:
+    """Directory for in-progress uploads, on the same filesystem as the store."""
+    return _root() / ".staging"
+
+
+def _commit(tmp_path: Path, digest: str) -> str:
+    """Move a fully written temp file into place under its digest."""
+    final = _root() / digest[:2] / digest
+    final.parent.mkdir(parents=True, exist_ok=True)
+    if final.exists():
+        tmp_path.unlink()
+    else:
+        os.replace(tmp_path, final)
+    return digest
+
+
+def adopt(path: str | os.PathLike, digest: str) -> str:
+    """Move an already hashed file (e.g. a spooled upload) into the store."""
+    return _commit(Path(path), digest)
+
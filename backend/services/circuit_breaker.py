@@ -0,0 +1,135 @@
+"""Circuit breakers for the primary model — skip straight to the fallback
+while the primary is failing instead of waiting for it to time out.
+
+One breaker per model and server (each Ollama host has its own), so one
+dead host does not send the healthy ones to the fallback. It opens after
+``circuit_failure_threshold`` consecutive failed or slow calls, sends every
+call to the fallback while open, and after ``circuit_reset_seconds`` lets a
+single half-open probe through: success closes it again, failure re-opens
+it.
+
+A call is slow when its time to first token, counted from when the
+limiter admits it, exceeds ``circuit_slow_call_seconds``. Neither time
+queued behind other jobs nor the length of the answer counts against the
+model.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from core.config import settings
+from services.llm_limiter import record_latencies
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, slow_call_seconds: float, reset_seconds: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.short_circuited = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """Whether the next call may go to the primary model."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.short_circuited += 1
+        return False
+
+    def record_success(self, latency: float):
+        if latency > self.slow_call_seconds:
+            self.record_failure()
+            return
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def record_abandoned(self):
+        """The call was cancelled before it could succeed or fail."""
+        self._probing = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "short_circuited": self.short_circuited,
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def _breaker_key(model: str, host: Optional[str]) -> str:
+    return f"{model}@{host}" if host else model
+
+
+def get_breaker(model: str, host: Optional[str] = None) -> CircuitBreaker:
+    """Return the shared breaker for a model (``backend:model``) on one host."""
+    key = _breaker_key(model, host)
+    breaker = _breakers.get(key)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            failure_threshold=settings.circuit_failure_threshold,
+            slow_call_seconds=settings.circuit_slow_call_seconds,
+            reset_seconds=settings.circuit_reset_seconds,
+        )
+        _breakers[key] = breaker
+    return breaker
+
+
+def breaker_stats() -> dict:
+    return {model: breaker.stats() for model, breaker in _breakers.items()}
+
+
+async def call_with_breaker(
+    model: str,
+    call: Callable[[bool], Awaitable[T]],
+    on_fallback: Optional[Callable[[], None]] = None,
+    host: Optional[str] = None,
+) -> T:
+    """Run ``call(False)`` on the primary model unless its breaker on
+    ``host`` is open, then ``call(True)`` on the fallback if that was
+    skipped or failed.
+
+    ``on_fallback`` runs before a fallback that follows a failed primary
+    call, e.g. to discard partially streamed output.
+    """
+    breaker = get_breaker(model, host)
+    if breaker.allow():
+        try:
+            with record_latencies() as latencies:
+                result = await call(False)
+        except asyncio.CancelledError:
+            breaker.record_abandoned()
+            raise
+        except Exception:
+            breaker.record_failure()
+            if on_fallback:
+                on_fallback()
+        else:
+            breaker.record_success(max(latencies, default=0.0))
+            return result
+    return await call(True)
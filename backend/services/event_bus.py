@@ -0,0 +1,115 @@
+"""In-process publish/subscribe for pushing job updates to open streams.
+
+Subscribers are asyncio queues bound to the loop they were created on;
+``publish`` is safe to call from any thread and never blocks. A subscriber
+that falls behind does not grow without bound: once its queue is full, its
+undelivered events are dropped and replaced by ``LAGGED``, after which it
+must resynchronise from the source of truth (the database or the job's
+stream buffers) rather than rely on the events it missed.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from threading import Lock
+from typing import Any, AsyncIterator
+
+from core.config import settings
+
+_QUEUE_SIZE = 256
+
+# Delivered in place of the events a full subscriber queue had to drop
+LAGGED = object()
+
+
+def _offer(queue: asyncio.Queue, event: Any) -> None:
+    if queue.full():
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(LAGGED)
+        return
+    queue.put_nowait(event)
+
+
+def drain(queue: asyncio.Queue) -> None:
+    """Discard queued events, e.g. before resynchronising after ``LAGGED``."""
+    while not queue.empty():
+        queue.get_nowait()
+
+
+class EventBus:
+    """Topic-keyed fan-out of events to asyncio queues."""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = (
+            defaultdict(set)
+        )
+        self._lock = Lock()
+
+    def publish(self, topic: str, event: Any) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for loop, queue in subscribers:
+            if loop.is_closed():
+                continue
+            loop.call_soon_threadsafe(_offer, queue, event)
+
+    def has_subscribers(self, topic: str) -> bool:
+        with self._lock:
+            return bool(self._subscribers.get(topic))
+
+    @asynccontextmanager
+    async def subscribe(self, topic: str) -> AsyncIterator[asyncio.Queue]:
+        entry = (asyncio.get_running_loop(), asyncio.Queue(maxsize=_QUEUE_SIZE))
+        with self._lock:
+            self._subscribers[topic].add(entry)
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(entry)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "topics": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+            }
+
+
+# Module-level singleton — shared by job processing and the stream routes
+_bus = EventBus()
+
+
+def get_event_bus() -> EventBus:
+    return _bus
+
+
+def status_topic(job_id: str) -> str:
+    return f"job-status:{job_id}"
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+SSE_KEEPALIVE = ": keep-alive\n\n"
+
+
+def db_recheck_seconds() -> float:
+    """How long an open stream waits for an event before re-reading the
+    database. With RUN_EMBEDDED_WORKERS=false every job runs in another
+    process and nothing is published here, so streams poll every
+    ``sse_db_poll_seconds``; otherwise only at the keep-alive interval."""
+    if settings.run_embedded_workers:
+        return settings.sse_keepalive_seconds
+    return min(settings.sse_db_poll_seconds, settings.sse_keepalive_seconds)
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
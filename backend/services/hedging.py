@@ -0,0 +1,143 @@
+"""Hedged LLM requests — cut tail latency caused by the occasional stuck call.
+
+Each kind of call (``"flowchart"``, ``"summary"``) keeps its recent time to
+first token. When hedging is enabled and a call has produced no token within
+the ``hedge_percentile`` of those samples, a duplicate is sent elsewhere
+(another host, or the fallback model) and the first attempt to start
+streaming wins; the other is cancelled. Racing on the first token rather
+than on completion lets the winner stream straight to the caller.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Optional, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+
+from core.config import settings
+from services.llm_limiter import limited_astream
+
+_WINDOW = 200
+
+
+class HedgeTracker:
+    """Recent first-token latencies and hedge counters for one kind of call."""
+
+    def __init__(self):
+        self.samples: deque[float] = deque(maxlen=_WINDOW)
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None to not hedge."""
+        if not settings.hedge_enabled or len(self.samples) < settings.hedge_min_samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = math.ceil(settings.hedge_percentile / 100 * len(ordered))
+        return ordered[min(len(ordered), max(1, rank)) - 1]
+
+    def stats(self) -> dict:
+        delay = self.hedge_delay()
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": round(self.hedged / self.calls, 3) if self.calls else 0.0,
+            "delay_s": round(delay, 3) if delay is not None else None,
+        }
+
+
+_trackers: dict[str, HedgeTracker] = {}
+
+
+def get_tracker(kind: str) -> HedgeTracker:
+    tracker = _trackers.get(kind)
+    if tracker is None:
+        tracker = _trackers[kind] = HedgeTracker()
+    return tracker
+
+
+def hedge_stats() -> dict:
+    return {kind: tracker.stats() for kind, tracker in _trackers.items()}
+
+
+class _Attempt:
+    """One in-flight copy of a call, fetching its first chunk in a task."""
+
+    def __init__(self, llm: BaseChatModel, messages: Sequence[BaseMessage], is_hedge: bool):
+        self.is_hedge = is_hedge
+        self.started = time.monotonic()
+        self.stream = limited_astream(llm, messages)
+        self.first = asyncio.ensure_future(anext(self.stream))
+
+    async def discard(self):
+        self.first.cancel()
+        await asyncio.gather(self.first, return_exceptions=True)
+        await self.stream.aclose()
+
+
+async def hedged_astream(
+    kind: str,
+    llm: BaseChatModel,
+    make_hedge: Callable[[], BaseChatModel],
+    messages: Sequence[BaseMessage],
+) -> AsyncIterator:
+    """Stream ``llm``'s output, hedging with ``make_hedge()`` if it is slow
+    to start. Failures raise only once no attempt is left."""
+    tracker = get_tracker(kind)
+    tracker.calls += 1
+    delay = tracker.hedge_delay()
+
+    live = [_Attempt(llm, messages, is_hedge=False)]
+    winner: Optional[_Attempt] = None
+    first = None
+    try:
+        while winner is None:
+            timeout = None
+            if delay is not None and len(live) == 1 and not live[0].is_hedge:
+                timeout = max(0.0, live[0].started + delay - time.monotonic())
+            done, _ = await asyncio.wait(
+                [attempt.first for attempt in live],
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                tracker.hedged += 1
+                delay = None
+                live.append(_Attempt(make_hedge(), messages, is_hedge=True))
+                continue
+
+            attempt = next(a for a in live if a.first in done)
+            live.remove(attempt)
+            try:
+                first = attempt.first.result()
+            except StopAsyncIteration:
+                first = None
+            except Exception:
+                if live:
+                    continue
+                raise
+            winner = attempt
+    finally:
+        for loser in live:
+            await loser.discard()
+
+    tracker.record(time.monotonic() - winner.started)
+    if winner.is_hedge:
+        tracker.hedge_wins += 1
+    if first is None:
+        return
+    try:
+        yield first
+        async for chunk in winner.stream:
+            yield chunk
+    finally:
+        await winner.stream.aclose()
@@ -0,0 +1,86 @@
+"""Token-level fan-out of background job output to stream subscribers.
+
+Each artifact (theory, notebook, flowchart) being generated for a job gets
+an ``ArtifactStream`` that publishes its tokens to the job's stream topic on
+the event bus and keeps the text produced so far, so a client connecting
+mid-generation can be sent a snapshot before live tokens.
+"""
+from __future__ import annotations
+
+from threading import Lock
+from typing import Callable, Optional
+
+from services.event_bus import get_event_bus
+
+# job_id -> artifact -> tokens so far
+_buffers: dict[str, dict[str, list[str]]] = {}
+_lock = Lock()
+
+
+def stream_topic(job_id: str) -> str:
+    return f"job-stream:{job_id}"
+
+
+class ArtifactStream:
+    """Publishes the tokens of one artifact of one job."""
+
+    def __init__(
+        self,
+        job_id: str,
+        artifact: str,
+        on_first_token: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.job_id = job_id
+        self.artifact = artifact
+        self._on_first_token = on_first_token
+
+    def _publish(self, event: str, data: dict) -> None:
+        get_event_bus().publish(
+            stream_topic(self.job_id),
+            {"event": event, "data": {"artifact": self.artifact, **data}},
+        )
+
+    def token(self, text: str) -> None:
+        if self._on_first_token:
+            self._on_first_token()
+            self._on_first_token = None
+        with _lock:
+            _buffers.setdefault(self.job_id, {}).setdefault(self.artifact, []).append(text)
+        self._publish("token", {"token": text})
+
+    def reset(self) -> None:
+        """Discard partial output, e.g. before retrying on the fallback model."""
+        with _lock:
+            _buffers.get(self.job_id, {}).pop(self.artifact, None)
+        self._publish("reset", {})
+
+    def done(self, content: str) -> None:
+        """Replace the streamed tokens with the final post-processed content."""
+        with _lock:
+            _buffers.setdefault(self.job_id, {})[self.artifact] = [content]
+        self._publish("artifact_done", {"content": content})
+
+
+def partial_artifacts(job_id: str) -> dict[str, str]:
+    """Return the text generated so far for each artifact of a job."""
+    with _lock:
+        return {
+            artifact: "".join(tokens)
+            for artifact, tokens in _buffers.get(job_id, {}).items()
+        }
+
+
+def discard_job_stream(job_id: str) -> None:
+    """Drop a job's buffers without ending its streams, e.g. when the job
+    was cancelled and another worker will run it."""
+    with _lock:
+        _buffers.pop(job_id, None)
+
+
+def finish_job_stream(job_id: str, status: str, error: Optional[str] = None) -> None:
+    """Tell subscribers the job has finished and drop its buffers."""
+    with _lock:
+        _buffers.pop(job_id, None)
+    get_event_bus().publish(
+        stream_topic(job_id), {"event": status, "data": {"error": error}}
+    )
@@ -0,0 +1,97 @@
+"""Process-wide registry of long-lived LLM clients.
+
+Chat models are cached by (backend, model, params), so every chain, chunk
+summary and retry shares one HTTP connection pool per configuration and
+reuses its keep-alive connections instead of opening new ones per call.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from core.config import settings
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+    )
+
+
+def _build(backend: str, model: str, params: dict[str, Any]) -> BaseChatModel:
+    if backend == "openai":
+        from langchain_openai import ChatOpenAI
+
+        limits = _limits()
+        return ChatOpenAI(
+            model=model,
+            http_client=httpx.Client(limits=limits, follow_redirects=True),
+            http_async_client=httpx.AsyncClient(limits=limits, follow_redirects=True),
+            **params,
+        )
+    if backend == "ollama":
+        from langchain_ollama import ChatOllama
+
+        # Passed through to the httpx clients ollama creates
+        return ChatOllama(model=model, client_kwargs={"limits": _limits()}, **params)
+    raise ValueError(f"Unknown LLM backend: {backend}")
+
+
+async def _close(llm: BaseChatModel):
+    """Close the HTTP clients behind a chat model."""
+    if getattr(llm, "http_async_client", None) is not None:
+        llm.http_client.close()
+        await llm.http_async_client.aclose()
+        return
+    # ChatOllama keeps its ollama clients as private attributes
+    sync_client = getattr(llm, "_client", None)
+    async_client = getattr(llm, "_async_client", None)
+    if sync_client is not None:
+        sync_client.close()
+    if async_client is not None:
+        await async_client.close()
+
+
+class LLMClientRegistry:
+    """Cache of chat models keyed by (backend, model, params)."""
+
+    def __init__(self):
+        self._models: dict[tuple, BaseChatModel] = {}
+        self._lock = threading.Lock()
+
+    def get(self, backend: str, model: str, **params: Any) -> BaseChatModel:
+        """Return the shared chat model for this configuration, creating it once."""
+        key = (backend, model, tuple(sorted(params.items())))
+        with self._lock:
+            llm = self._models.get(key)
+            if llm is None:
+                llm = _build(backend, model, params)
+                self._models[key] = llm
+            return llm
+
+    async def aclose(self):
+        """Close every client; later ``get`` calls create fresh ones."""
+        with self._lock:
+            models = list(self._models.values())
+            self._models.clear()
+        for llm in models:
+            await _close(llm)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"clients": len(self._models)}
+
+
+_registry: LLMClientRegistry | None = None
+
+
+def get_client_registry() -> LLMClientRegistry:
+    global _registry
+    if _registry is None:
+        _registry = LLMClientRegistry()
+    return _registry
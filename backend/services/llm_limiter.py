@@ -0,0 +1,230 @@
+"""Admission control for LLM calls — adaptive concurrency limits per server.
+
+Every generation request goes through the ``AdaptiveLimiter`` of the server
+it targets (one per backend and base URL), so concurrent jobs queue here
+instead of piling requests onto an Ollama that serves one or two at a time.
+The limit follows AIMD: it grows by roughly one slot per window of calls
+answered under ``llm_target_latency_seconds`` and halves when a call is
+slower than that or fails.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator, Optional, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+
+from core.config import settings
+
+
+# Latencies of the calls that succeed in the current context, measured from
+# admission (see ``record_latencies``)
+_latencies: ContextVar[Optional[list[float]]] = ContextVar(
+    "llm_call_latencies", default=None
+)
+
+
+@contextmanager
+def record_latencies() -> Iterator[list[float]]:
+    """Collect the latency of every call that succeeds within the block.
+
+    Latency is counted from the moment the limiter admits the call, so time
+    spent queued for a slot is excluded; streaming calls report their time
+    to first token.
+    """
+    latencies: list[float] = []
+    token = _latencies.set(latencies)
+    try:
+        yield latencies
+    finally:
+        _latencies.reset(token)
+
+
+class _Slot:
+    """One admitted call. Streaming calls report time to first token as their
+    latency, since total time depends on how much the model writes."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.latency: Optional[float] = None
+
+    def first_token(self):
+        if self.latency is None:
+            self.latency = time.monotonic() - self.started
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with a FIFO wait queue."""
+
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        target_latency: float,
+        decrease_factor: float = 0.5,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(max(self.min_limit, self.max_limit // 2))
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.latency_ewma: Optional[float] = None
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def _acquire(self):
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just as we were cancelled — hand the slot on
+                self._release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _release(self):
+        self.in_flight -= 1
+        self._admit()
+
+    def _admit(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _record(self, latency: Optional[float]):
+        """Adjust the limit after a call; ``latency`` is None for a failure."""
+        if latency is None:
+            self.consecutive_failures += 1
+        else:
+            self.consecutive_failures = 0
+            self.latency_ewma = (
+                latency if self.latency_ewma is None
+                else 0.8 * self.latency_ewma + 0.2 * latency
+            )
+        if latency is not None and latency <= self.target_latency:
+            # Additive increase — about one slot per ``limit`` good calls
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._admit()
+            return
+        # Multiplicative decrease, at most once per latency window so one
+        # burst of slow calls doesn't collapse the limit to the minimum
+        now = time.monotonic()
+        if now - self._last_decrease >= self.target_latency:
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            self._last_decrease = now
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[_Slot]:
+        """Wait for a free slot and hold it for the duration of one call."""
+        await self._acquire()
+        slot = _Slot()
+        try:
+            yield slot
+        except Exception:
+            self._record(None)
+            raise
+        else:
+            latency = (
+                slot.latency if slot.latency is not None
+                else time.monotonic() - slot.started
+            )
+            self._record(latency)
+            latencies = _latencies.get()
+            if latencies is not None:
+                latencies.append(latency)
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "consecutive_failures": self.consecutive_failures,
+            "latency_ewma_s": (
+                round(self.latency_ewma, 3) if self.latency_ewma is not None else None
+            ),
+        }
+
+
+# ── Per-server registry ──────────────────────────────────────────────────────
+
+_limiters: dict[str, AdaptiveLimiter] = {}
+
+
+def _server_of(llm: BaseChatModel) -> tuple[str, str]:
+    """Return (backend, base URL) of the server a chat model talks to."""
+    base_url = getattr(llm, "base_url", None) or getattr(llm, "openai_api_base", None)
+    if "ollama" in llm._llm_type:
+        return "ollama", base_url or settings.ollama_base_url
+    if "openai" in llm._llm_type:
+        return "openai", base_url or "https://api.openai.com/v1"
+    return llm._llm_type, base_url or ""
+
+
+def get_limiter(llm: BaseChatModel) -> AdaptiveLimiter:
+    """Return the shared limiter for the server behind ``llm``."""
+    return get_server_limiter(*_server_of(llm))
+
+
+def get_server_limiter(backend: str, base_url: str) -> AdaptiveLimiter:
+    """Return the shared limiter for one backend server."""
+    key = f"{backend}:{base_url}"
+    limiter = _limiters.get(key)
+    if limiter is None:
+        max_limit = (
+            settings.ollama_max_concurrency if backend == "ollama"
+            else settings.openai_max_concurrency
+        )
+        limiter = AdaptiveLimiter(
+            min_limit=settings.llm_min_concurrency,
+            max_limit=max_limit,
+            target_latency=settings.llm_target_latency_seconds,
+        )
+        _limiters[key] = limiter
+    return limiter
+
+
+def limiter_stats() -> dict:
+    """Limit, in-flight calls and queue depth of every server's limiter."""
+    return {key: limiter.stats() for key, limiter in _limiters.items()}
+
+
+# ── Admitted calls ───────────────────────────────────────────────────────────
+
+async def limited_ainvoke(llm: BaseChatModel, messages: Sequence[BaseMessage]):
+    """``llm.ainvoke`` once the server's limiter admits the call."""
+    async with get_limiter(llm).slot():
+        return await llm.ainvoke(list(messages))
+
+
+async def limited_astream(
+    llm: BaseChatModel, messages: Sequence[BaseMessage]
+) -> AsyncIterator:
+    """``llm.astream`` holding a limiter slot until the stream ends."""
+    async with get_limiter(llm).slot() as slot:
+        async for chunk in llm.astream(list(messages)):
+            slot.first_token()
+            yield chunk
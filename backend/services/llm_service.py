@@ -1,72 +1,324 @@
 """LLM factory and transcript preparation service."""
 from __future__ import annotations
 
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, Optional, Sequence, TypeVar
+
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import BaseMessage, HumanMessage
 
 from core.config import settings
+from services.llm_clients import get_client_registry
+from services.llm_limiter import limited_astream
+from services.ollama_hosts import get_host_pool
+from services.circuit_breaker import call_with_breaker
+from services.hedging import hedged_astream
+from services.token_counter import count_tokens, get_token_counter
+from services.model_capabilities import (
+    get_capabilities,
+    summary_chunk_tokens,
+    transcript_token_limit,
+)
 
+T = TypeVar("T")
 
-def get_llm(fallback: bool = False) -> BaseChatModel:
-    """Return the configured LLM instance."""
-    if settings.llm_backend == "openai":
-        from langchain_openai import ChatOpenAI
+# Ollama host every get_llm() call in the current context is pinned to
+_pinned_host: ContextVar[Optional[str]] = ContextVar("pinned_ollama_host", default=None)
+
+
+@contextmanager
+def pin_host() -> Iterator[None]:
+    """Send every call made within the block (including tasks it starts) to
+    one Ollama host, so requests sharing a prompt prefix hit the same KV cache."""
+    if settings.llm_backend != "ollama" or _pinned_host.get() is not None:
+        yield
+        return
+    token = _pinned_host.set(get_host_pool().pick())
+    try:
+        yield
+    finally:
+        _pinned_host.reset(token)
+
+
+def _usable_pin() -> Optional[str]:
+    """The pinned host, unless it has been ejected from the pool."""
+    pinned = _pinned_host.get()
+    if pinned is not None and not get_host_pool().is_available(pinned):
+        return None
+    return pinned
 
+
+def get_llm(
+    fallback: bool = False,
+    host: Optional[str] = None,
+    max_output_tokens: Optional[int] = None,
+) -> BaseChatModel:
+    """Return the configured LLM instance, backed by a pooled long-lived client.
+
+    Ollama calls go to ``host`` if given, else the pinned host, else the
+    least-loaded one. Fallback calls ignore the pin and avoid the pinned
+    host when another is available, since they usually follow a failure
+    there. ``max_output_tokens`` replaces the model's registry output limit.
+    """
+    registry = get_client_registry()
+    if settings.llm_backend == "openai":
         base_url = settings.openai_base_url or None
         if not base_url and settings.openai_api_key.startswith("sk-or-v1-"):
             base_url = "https://openrouter.ai/api/v1"
 
-        return ChatOpenAI(
-            model=settings.openai_model,
+        return registry.get(
+            "openai",
+            settings.openai_model,
             temperature=0.2,
+            # None for models missing from the registry: no cap
+            max_tokens=(
+                max_output_tokens
+                or get_capabilities(settings.openai_model).max_output_tokens
+            ),
             api_key=settings.openai_api_key,
             base_url=base_url,
+            stream_usage=True,
         )
     else:
-        from langchain_ollama import ChatOllama
         model = settings.ollama_fallback_model if fallback else settings.ollama_model
-        return ChatOllama(
-            model=model,
-            base_url=settings.ollama_base_url,
+        caps = get_capabilities(model)
+        if host is None:
+            pool = get_host_pool()
+            if fallback:
+                host = pool.pick(exclude=_pinned_host.get())
+            else:
+                host = _usable_pin() or pool.pick()
+        return registry.get(
+            "ollama",
+            model,
+            base_url=host,
             temperature=0.2,
-            num_predict=4096,
-            num_ctx=8192,
+            num_predict=max_output_tokens or caps.max_output_tokens,
+            num_ctx=caps.context_tokens,
             repeat_penalty=1.1,
             top_p=0.9,
         )
 
 
+def _primary_model() -> str:
+    if settings.llm_backend == "openai":
+        return f"openai:{settings.openai_model}"
+    return f"ollama:{settings.ollama_model}"
+
+
+def _primary_host() -> Optional[str]:
+    """The Ollama host the next primary-model call goes to (None for OpenAI)."""
+    if settings.llm_backend != "ollama":
+        return None
+    return _usable_pin() or get_host_pool().pick()
+
+
+async def run_with_fallback(
+    call: Callable[[bool], Awaitable[T]],
+    on_fallback: Optional[Callable[[], None]] = None,
+) -> T:
+    """Run ``call(fallback)`` on the primary model through the circuit
+    breaker of the host it goes to, falling back to ``call(True)`` while
+    that breaker is open or on failure."""
+    host = _primary_host()
+
+    async def _call(fallback: bool) -> T:
+        if host is None:
+            return await call(fallback)
+        # Keep the primary call on the host whose breaker judges it; the
+        # fallback ignores the pin and steers clear of that host
+        token = _pinned_host.set(host)
+        try:
+            return await call(fallback)
+        finally:
+            _pinned_host.reset(token)
+
+    return await call_with_breaker(_primary_model(), _call, on_fallback, host=host)
+
+
+def _hedge_llm(llm: BaseChatModel) -> BaseChatModel:
+    """Where a hedged duplicate goes: the same model on another available
+    Ollama host, or the fallback model when there is no other host."""
+    if settings.llm_backend != "ollama":
+        return get_llm(fallback=True)
+    primary_host = getattr(llm, "base_url", None)
+    other = get_host_pool().pick(exclude=primary_host)
+    if other == primary_host:
+        return get_llm(fallback=True, host=other)
+    is_fallback = getattr(llm, "model", None) == settings.ollama_fallback_model
+    return get_llm(fallback=is_fallback, host=other)
+
+
+async def stream_llm(
+    llm: BaseChatModel,
+    messages: Sequence[BaseMessage],
+    on_token: Optional[Callable[[str], None]] = None,
+    hedge: Optional[str] = None,
+    stats: Optional[dict] = None,
+) -> str:
+    """Generate with ``llm.astream``, passing each token to ``on_token``.
+
+    The call waits for a slot from the server's adaptive limiter first.
+    With ``hedge`` set to a kind of call, a slow start is hedged with a
+    duplicate request (see ``services.hedging``). ``stats`` receives the
+    prompt-processing figures the backend reports (see ``_prompt_stats``).
+    """
+    if hedge:
+        chunks = hedged_astream(hedge, llm, lambda: _hedge_llm(llm), messages)
+    else:
+        chunks = limited_astream(llm, messages)
+    if stats is not None:
+        stats.clear()
+    started = time.monotonic()
+    parts: list[str] = []
+    async for chunk in chunks:
+        if stats is not None:
+            if "first_token_ms" not in stats:
+                stats["first_token_ms"] = int((time.monotonic() - started) * 1000)
+            _prompt_stats(chunk, stats)
+        if chunk.content:
+            parts.append(chunk.content)
+            if on_token:
+                on_token(chunk.content)
+    return "".join(parts)
+
+
+def _prompt_stats(chunk, stats: dict):
+    """Record prompt-processing figures reported on a streamed chunk.
+
+    OpenAI reports prompt and cached prompt tokens (``stream_usage``);
+    Ollama reports how many prompt tokens it evaluated and how long that
+    took — tokens served from its KV cache are not evaluated again.
+    """
+    usage = getattr(chunk, "usage_metadata", None)
+    if usage:
+        stats["prompt_tokens"] = usage.get("input_tokens")
+        cached = (usage.get("input_token_details") or {}).get("cache_read")
+        if cached is not None:
+            stats["cached_tokens"] = cached
+    metadata = chunk.response_metadata or {}
+    if metadata.get("prompt_eval_duration") is not None:
+        stats["prompt_eval_tokens"] = metadata.get("prompt_eval_count")
+        stats["prompt_eval_ms"] = round(metadata["prompt_eval_duration"] / 1e6, 1)
+
+
 def _needs_chunking(text: str) -> bool:
-    approx_tokens = len(text) // 4
-    return approx_tokens > settings.max_transcript_tokens
+    return count_tokens(text) > transcript_token_limit()
+
+
+_CHUNK_PROMPT = (
+    "Summarise the following section of a coding lecture transcript. "
+    "Preserve all technical details, algorithms, code patterns, and examples:\n\n"
+)
+
+_REDUCE_PROMPT = (
+    "The following are summaries of consecutive sections of a coding lecture. "
+    "Combine them into a single summary in the same order. "
+    "Preserve all technical details, algorithms, code patterns, and examples:\n\n"
+)
+
+
+async def _summarise(instruction: str, text: str) -> str:
+    """Summarise one piece of text, retrying transient failures with backoff.
 
+    The model is fetched per attempt so every call, retries included, is
+    routed to the least-loaded host.
+    """
+    prompt = f"{instruction}{text}"
+    for attempt in range(settings.summary_max_retries + 1):
+        try:
+            return await stream_llm(
+                get_llm(), [HumanMessage(content=prompt)], hedge="summary"
+            )
+        except Exception:
+            if attempt == settings.summary_max_retries:
+                raise
+            await asyncio.sleep(2 ** attempt)
 
-async def chunk_and_summarise(transcript: str) -> str:
-    """Split long transcripts into chunks and summarise each with the LLM."""
+
+async def _reduce_summaries(
+    summaries: list[str],
+    semaphore: asyncio.Semaphore,
+    stats: dict,
+) -> str:
+    """Re-summarise groups of summaries until the joined text fits the budget."""
+    group_size = max(2, settings.summary_reduce_group_size)
+    joined = "\n\n".join(summaries)
+    while (
+        _needs_chunking(joined)
+        and len(summaries) > 1
+        and stats["depth"] < settings.summary_max_depth
+    ):
+        groups = [
+            "\n\n".join(summaries[i:i + group_size])
+            for i in range(0, len(summaries), group_size)
+        ]
+
+        async def _run(group: str) -> str:
+            async with semaphore:
+                return await _summarise(_REDUCE_PROMPT, group)
+
+        summaries = list(await asyncio.gather(*(_run(g) for g in groups)))
+        stats["depth"] += 1
+        stats["fan_out"].append(len(summaries))
+        joined = "\n\n".join(summaries)
+    return joined
+
+
+async def chunk_and_summarise(
+    transcript: str,
+    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    stats: Optional[dict] = None,
+) -> str:
+    """Split long transcripts into chunks and summarise each with the LLM.
+
+    Chunks are summarised concurrently (at most ``summary_concurrency`` at a
+    time) in their original order. If the joined summaries still exceed the
+    transcript token limit they are summarised again in groups of
+    ``summary_reduce_group_size`` until they fit. ``on_progress(done, total)``
+    is awaited after each chunk finishes; when ``stats`` is given it receives
+    the tree shape as ``{"chunks", "depth", "fan_out"}``.
+    """
+    chunk_tokens = summary_chunk_tokens()
     splitter = RecursiveCharacterTextSplitter(
-        chunk_size=2000 * 4,
-        chunk_overlap=200 * 4,
-        length_function=len,
+        chunk_size=chunk_tokens,
+        chunk_overlap=chunk_tokens // 10,
+        length_function=get_token_counter().count,
     )
     chunks = splitter.split_text(transcript)
 
-    llm = get_llm()
-    summaries: list[str] = []
-    for chunk in chunks:
-        prompt = (
-            "Summarise the following section of a coding lecture transcript. "
-            "Preserve all technical details, algorithms, code patterns, and examples:\n\n"
-            f"{chunk}"
-        )
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
-        summaries.append(response.content)
+    semaphore = asyncio.Semaphore(max(1, settings.summary_concurrency))
+    done = 0
+
+    async def _run(chunk: str) -> str:
+        nonlocal done
+        async with semaphore:
+            summary = await _summarise(_CHUNK_PROMPT, chunk)
+        done += 1
+        if on_progress:
+            await on_progress(done, len(chunks))
+        return summary
 
-    return "\n\n".join(summaries)
+    summaries = await asyncio.gather(*(_run(chunk) for chunk in chunks))
 
+    if stats is None:
+        stats = {}
+    stats.update(chunks=len(chunks), depth=1, fan_out=[len(chunks)])
+    return await _reduce_summaries(list(summaries), semaphore, stats)
 
-async def prepare_transcript(raw_transcript: str) -> str:
+
+async def prepare_transcript(
+    raw_transcript: str,
+    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    stats: Optional[dict] = None,
+) -> str:
     """Return the transcript ready for LLM chains, chunking if needed."""
     if _needs_chunking(raw_transcript):
-        return await chunk_and_summarise(raw_transcript)
+        return await chunk_and_summarise(
+            raw_transcript, on_progress=on_progress, stats=stats
+        )
     return raw_transcript
@@ -0,0 +1,149 @@
+"""Per-model capabilities — context window, output budget and chunk size.
+
+These drive the generation limits passed to the backend (``num_ctx`` /
+``num_predict`` for Ollama, ``max_tokens`` for OpenAI), the size of the
+chunks long transcripts are split into, and the transcript length above
+which chunking kicks in. Models are matched by the longest known name
+prefix, so ``codellama:34b-instruct`` uses the ``codellama:34b`` entry.
+
+Ollama entries use the model's trained window, up to 32k tokens. For the
+default codellama models that is 16k, twice the 8192 ``num_ctx`` used
+before the registry. Ollama allocates the KV cache for the whole window up
+front, so on small GPUs set ``LLM_CONTEXT_TOKENS=8192``; it and the other
+``LLM_*`` limits override the registry for every model.
+
+Models missing from the registry keep the limits used before it existed:
+chunking above 6000 transcript tokens, ``num_ctx=8192`` and
+``num_predict=4096`` on Ollama, and no ``max_tokens`` cap on OpenAI.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from core.config import settings
+
+# Tokens reserved for the system/instruction prompts around the transcript;
+# the longest per-artifact prompt (notebook) is about 400
+PROMPT_OVERHEAD_TOKENS = 800
+
+
+@dataclass(frozen=True)
+class ModelCapabilities:
+    context_tokens: int
+    max_output_tokens: Optional[int]  # None leaves the backend's own limit
+    chunk_tokens: int
+    # Fixed chunking threshold instead of one derived from the window
+    transcript_tokens: Optional[int] = None
+
+    @property
+    def transcript_budget(self) -> int:
+        """Longest transcript that fits next to the prompts and a full answer."""
+        if self.transcript_tokens is not None:
+            return self.transcript_tokens
+        return (
+            self.context_tokens - (self.max_output_tokens or 0) - PROMPT_OVERHEAD_TOKENS
+        )
+
+
+# Models missing from the registry, per backend (the old fixed limits)
+_DEFAULTS = {
+    "ollama": ModelCapabilities(8192, 4096, 2000, transcript_tokens=6000),
+    "openai": ModelCapabilities(8192, None, 2000, transcript_tokens=6000),
+}
+
+_REGISTRY: dict[str, ModelCapabilities] = {
+    # OpenAI
+    "gpt-4o": ModelCapabilities(128_000, 16_384, 8000),
+    "gpt-4.1": ModelCapabilities(1_047_576, 32_768, 8000),
+    "gpt-4-turbo": ModelCapabilities(128_000, 4096, 8000),
+    "gpt-4": ModelCapabilities(8192, 2048, 2000),
+    "gpt-3.5-turbo": ModelCapabilities(16_385, 4096, 4000),
+    # Ollama
+    "codellama": ModelCapabilities(16_384, 4096, 2000),
+    "codellama:34b": ModelCapabilities(16_384, 4096, 3000),
+    "deepseek-coder": ModelCapabilities(16_384, 4096, 3000),
+    "llama3": ModelCapabilities(8192, 2048, 2000),
+    "llama3.1": ModelCapabilities(32_768, 8192, 6000),
+    "llama3.2": ModelCapabilities(32_768, 8192, 6000),
+    "mistral": ModelCapabilities(32_768, 8192, 6000),
+    "qwen2.5-coder": ModelCapabilities(32_768, 8192, 6000),
+}
+
+
+def get_capabilities(model: str, backend: Optional[str] = None) -> ModelCapabilities:
+    """Return the capabilities of ``model`` (a name such as ``gpt-4o`` or
+    ``codellama:13b``) on ``backend`` (default: the configured one), with any
+    configured overrides applied."""
+    # OpenRouter-style names carry a provider prefix: openai/gpt-4o
+    name = model.lower().rsplit("/", 1)[-1]
+    matches = [key for key in _REGISTRY if name == key or name.startswith(key)]
+    if matches:
+        caps = _REGISTRY[max(matches, key=len)]
+    else:
+        caps = _DEFAULTS[backend or settings.llm_backend]
+
+    overrides = {
+        field: value
+        for field, value in (
+            ("context_tokens", settings.llm_context_tokens),
+            ("max_output_tokens", settings.llm_max_output_tokens),
+            ("chunk_tokens", settings.llm_chunk_tokens),
+        )
+        if value > 0
+    }
+    if "context_tokens" in overrides or "max_output_tokens" in overrides:
+        # A configured window replaces the fixed default threshold
+        overrides["transcript_tokens"] = None
+    return replace(caps, **overrides) if overrides else caps
+
+
+def generation_models() -> list[str]:
+    """Every model a job's prepared transcript may be sent to."""
+    if settings.llm_backend == "openai":
+        return [settings.openai_model]
+    return [settings.ollama_model, settings.ollama_fallback_model]
+
+
+def transcript_token_limit() -> int:
+    """Transcripts longer than this are chunked and summarised first.
+
+    ``MAX_TRANSCRIPT_TOKENS`` wins when set; otherwise it is the smallest
+    budget among the primary and fallback models, since either may end up
+    answering.
+    """
+    if settings.max_transcript_tokens > 0:
+        return settings.max_transcript_tokens
+    return max(1, min(
+        get_capabilities(model).transcript_budget for model in generation_models()
+    ))
+
+
+# Output each artifact gets in separate mode (the old fixed num_predict)
+ARTIFACT_OUTPUT_TOKENS = 4096
+# Least output per artifact worth writing them in one call
+MIN_COMBINED_ARTIFACT_TOKENS = 1024
+
+
+def combined_output_tokens(artifacts: int, prompt_tokens: int) -> Optional[int]:
+    """Output budget for writing ``artifacts`` artifacts in one call.
+
+    The call gets what is left of the smallest window after a prompt of
+    ``prompt_tokens``, up to ``ARTIFACT_OUTPUT_TOKENS`` per artifact as
+    separate calls would get, and within OpenAI's output limit. Returns None
+    when that leaves less than ``MIN_COMBINED_ARTIFACT_TOKENS`` per artifact.
+    """
+    budget = artifacts * ARTIFACT_OUTPUT_TOKENS
+    for model in generation_models():
+        caps = get_capabilities(model)
+        budget = min(budget, caps.context_tokens - prompt_tokens)
+        if settings.llm_backend == "openai" and caps.max_output_tokens is not None:
+            budget = min(budget, caps.max_output_tokens)
+    if budget < artifacts * MIN_COMBINED_ARTIFACT_TOKENS:
+        return None
+    return budget
+
+
+def summary_chunk_tokens() -> int:
+    """Chunk size for summarisation, small enough for every model involved."""
+    return min(get_capabilities(model).chunk_tokens for model in generation_models())
@@ -0,0 +1,124 @@
+"""Pool of Ollama hosts — routes each call to the least-loaded healthy one.
+
+Load comes from each host's adaptive limiter: calls in flight and queued,
+scaled by the host's current limit and recent latency. Hosts are probed
+every ``ollama_health_check_seconds`` and skipped while the probe fails or
+after ``ollama_eject_after_failures`` consecutive failed calls, until a
+probe succeeds again.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+from core.config import settings
+from services.llm_limiter import AdaptiveLimiter, get_server_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class OllamaHostPool:
+    def __init__(
+        self, hosts: list[str], check_interval: float, eject_after_failures: int
+    ):
+        self.hosts = hosts
+        self.check_interval = check_interval
+        self.eject_after_failures = eject_after_failures
+        self._healthy = {host: True for host in hosts}
+        self._task: Optional[asyncio.Task] = None
+
+    def _limiter(self, host: str) -> AdaptiveLimiter:
+        return get_server_limiter("ollama", host)
+
+    def is_available(self, host: str) -> bool:
+        """Whether ``host`` passes health checks and has not been ejected."""
+        return (
+            self._healthy.get(host, False)
+            and self._limiter(host).consecutive_failures < self.eject_after_failures
+        )
+
+    def _expected_wait(self, host: str) -> tuple[float, int]:
+        limiter = self._limiter(host)
+        load = limiter.in_flight + limiter.queue_depth
+        return (load + 1) / limiter.limit * (limiter.latency_ewma or 0.0), load
+
+    def pick(self, exclude: Optional[str] = None) -> str:
+        """Return the host expected to answer the next call soonest,
+        avoiding ``exclude`` whenever another host is available."""
+        if len(self.hosts) == 1:
+            return self.hosts[0]
+        available = [h for h in self.hosts if self.is_available(h)]
+        # With every host down, keep trying all of them rather than none
+        candidates = [h for h in available if h != exclude] or available or self.hosts
+        return min(candidates, key=self._expected_wait)
+
+    # ── Health checks ──
+
+    async def _probe(self, client: httpx.AsyncClient, host: str):
+        try:
+            response = await client.get(f"{host}/api/version")
+            healthy = response.status_code == 200
+        except httpx.HTTPError:
+            healthy = False
+
+        if healthy != self._healthy[host]:
+            logger.warning(
+                "Ollama host %s is %s", host, "back" if healthy else "unhealthy"
+            )
+        self._healthy[host] = healthy
+        if healthy:
+            self._limiter(host).consecutive_failures = 0
+
+    async def check(self):
+        """Probe every host once."""
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            await asyncio.gather(*(self._probe(client, host) for host in self.hosts))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Ollama health check failed")
+            await asyncio.sleep(self.check_interval)
+
+    def start(self):
+        """Start periodic health checks; a single host has nothing to fail over to."""
+        if len(self.hosts) > 1 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            host: {
+                "healthy": self._healthy[host],
+                "available": self.is_available(host),
+                **self._limiter(host).stats(),
+            }
+            for host in self.hosts
+        }
+
+
+_pool: OllamaHostPool | None = None
+
+
+def get_host_pool() -> OllamaHostPool:
+    global _pool
+    if _pool is None:
+        _pool = OllamaHostPool(
+            settings.ollama_hosts,
+            check_interval=settings.ollama_health_check_seconds,
+            eject_after_failures=settings.ollama_eject_after_failures,
+        )
+    return _pool
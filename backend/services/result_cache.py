@@ -0,0 +1,172 @@
+"""Content-addressed cache of finished job results.
+
+The key is a hash of the normalised extracted text, the prompt templates and
+the model name, so identical inputs processed with the same prompts and model
+reuse an earlier job's ``result_json`` instead of calling the LLM again.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Optional
+
+from core.config import settings
+from core.database import SessionLocal
+from models.schemas import Job, ResultCacheEntry
+from chains.prompts import (
+    COMBINED_PROMPT,
+    CONTEXT_PROMPT,
+    FLOWCHART_PROMPT,
+    NOTEBOOK_PROMPT,
+    THEORY_PROMPT,
+)
+
+# Process-local hit/miss counters
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_stats_lock = Lock()
+
+
+def _model_name() -> str:
+    if settings.llm_backend == "openai":
+        return settings.openai_model
+    return settings.ollama_model
+
+
+def _prompt_version() -> str:
+    """Fingerprint of every prompt that shapes a job's result."""
+    digest = hashlib.sha256()
+    prompts = (
+        CONTEXT_PROMPT, THEORY_PROMPT, NOTEBOOK_PROMPT, FLOWCHART_PROMPT,
+        COMBINED_PROMPT,
+    )
+    for prompt in prompts:
+        digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def normalise_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a key."""
+    return " ".join(text.split())
+
+
+def compute_input_hash(text: str, generation_mode: str = "separate") -> str:
+    """Return the cache key for extracted input text."""
+    digest = hashlib.sha256()
+    digest.update(_prompt_version().encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(f"{settings.llm_backend}:{_model_name()}".encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(generation_mode.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalise_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+def lookup(key: str) -> Optional[str]:
+    """Return the cached ``result_json`` for a key, or None on a miss."""
+    if not settings.result_cache_enabled:
+        return None
+
+    db = SessionLocal()
+    try:
+        entry = db.query(ResultCacheEntry).filter(ResultCacheEntry.key == key).first()
+        now = datetime.now(timezone.utc)
+        if entry is not None and _is_expired(entry, now):
+            db.delete(entry)
+            db.commit()
+            _count("evictions")
+            entry = None
+
+        job = None
+        if entry is not None:
+            job = db.query(Job).filter(Job.id == entry.job_id, Job.status == "done").first()
+
+        if job is None or not job.result_json:
+            _count("misses")
+            return None
+
+        entry.hit_count += 1
+        entry.last_hit_at = now
+        db.commit()
+        _count("hits")
+        return job.result_json
+    finally:
+        db.close()
+
+
+def store(key: str, job_id: str) -> None:
+    """Record a finished job as the result for a key and evict old entries."""
+    if not settings.result_cache_enabled:
+        return
+
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        entry = db.query(ResultCacheEntry).filter(ResultCacheEntry.key == key).first()
+        if entry is None:
+            db.add(ResultCacheEntry(
+                key=key, job_id=job_id, hit_count=0, created_at=now, last_hit_at=now,
+            ))
+        else:
+            entry.job_id = job_id
+            entry.created_at = now
+            entry.last_hit_at = now
+        db.commit()
+        _evict(db, now)
+    finally:
+        db.close()
+
+
+def _is_expired(entry: ResultCacheEntry, now: datetime) -> bool:
+    created_at = entry.created_at
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return now - created_at > timedelta(seconds=settings.result_cache_ttl_seconds)
+
+
+def _evict(db, now: datetime) -> None:
+    """Drop expired entries, then the least recently hit beyond the size cap."""
+    cutoff = now - timedelta(seconds=settings.result_cache_ttl_seconds)
+    evicted = (
+        db.query(ResultCacheEntry)
+        .filter(ResultCacheEntry.created_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+
+    overflow = db.query(ResultCacheEntry).count() - settings.result_cache_max_entries
+    if overflow > 0:
+        stale = (
+            db.query(ResultCacheEntry.key)
+            .order_by(ResultCacheEntry.last_hit_at)
+            .limit(overflow)
+            .all()
+        )
+        evicted += (
+            db.query(ResultCacheEntry)
+            .filter(ResultCacheEntry.key.in_([k for (k,) in stale]))
+            .delete(synchronize_session=False)
+        )
+    db.commit()
+    if evicted:
+        _count("evictions", evicted)
+
+
+def cache_stats() -> dict:
+    """Return hit/miss/eviction counters for this process plus the entry count."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+
+    db = SessionLocal()
+    try:
+        stats["entries"] = db.query(ResultCacheEntry).count()
+    finally:
+        db.close()
+    return stats
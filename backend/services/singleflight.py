@@ -0,0 +1,77 @@
+"""In-flight request coalescing ("single flight") keyed by input hash.
+
+When several callers ask for the same work while it is already running,
+only the first one runs it; the rest wait for and share its outcome.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class LeaderCancelled(Exception):
+    """Raised in followers when the call they attached to was cancelled."""
+
+
+def make_key(namespace: str, *parts: str | bytes) -> str:
+    """Build a coalescing key from a namespace and hashed input parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else part.encode("utf-8"))
+        digest.update(b"\0")
+    return f"{namespace}:{digest.hexdigest()}"
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key onto one execution."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def is_running(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """Run ``fn`` unless a call for ``key`` is already in flight.
+
+        Returns ``(result, shared)`` where ``shared`` is True when this caller
+        attached to another caller's execution. Exceptions raised by the
+        leader propagate to every caller; if the leader is cancelled, its
+        followers get ``LeaderCancelled`` rather than being cancelled too.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(LeaderCancelled(key))
+            future.exception()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so a flight without followers does not warn
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {"in_flight": len(self._inflight)}
+
+
+# Module-level singleton — shared by the job processor and the sync routers
+_group = SingleFlight()
+
+
+def get_singleflight() -> SingleFlight:
+    return _group
@@ -0,0 +1,142 @@
+"""Token counting for chunking decisions — the model's tokenizer when one is
+available, a characters-per-token heuristic otherwise.
+
+``TOKEN_COUNTER=auto`` picks tiktoken for OpenAI models and, for Ollama, a
+Hugging Face ``tokenizers`` tokenizer named by ``OLLAMA_TOKENIZER`` (a hub
+id or a local ``tokenizer.json``). Both are optional: a tokenizer that is
+not installed or cannot be loaded falls back to the heuristic with a
+warning. Counts of whole texts are memoised by their hash, so the same
+transcript is only tokenized once per job.
+
+Loading a tokenizer may download its vocabulary, so it happens once at
+startup (``init_token_counter``) in a worker thread with a timeout, never
+on the event loop. Until then, and in processes that never call it,
+counts use the heuristic.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MEMO_SIZE = 1024
+
+
+class TokenCounter:
+    """Counts tokens with ``encode(text) -> token count``."""
+
+    def __init__(self, name: str, encode: Callable[[str], int]):
+        self.name = name
+        self._encode = encode
+
+    def count(self, text: str) -> int:
+        return self._encode(text) if text else 0
+
+
+def _heuristic() -> TokenCounter:
+    return TokenCounter("heuristic", lambda text: max(1, len(text) // 4))
+
+
+def _tiktoken(model: str) -> TokenCounter:
+    import tiktoken
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+    return TokenCounter(
+        f"tiktoken:{encoding.name}",
+        lambda text: len(encoding.encode(text, disallowed_special=())),
+    )
+
+
+def _huggingface(name: str) -> TokenCounter:
+    from tokenizers import Tokenizer
+    if os.path.isfile(name):
+        tokenizer = Tokenizer.from_file(name)
+    else:
+        tokenizer = Tokenizer.from_pretrained(name)
+    return TokenCounter(
+        f"huggingface:{name}",
+        lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids),
+    )
+
+
+def _build_counter() -> TokenCounter:
+    kind = settings.token_counter
+    if kind == "auto":
+        if settings.llm_backend == "openai":
+            kind = "tiktoken"
+        elif settings.ollama_tokenizer:
+            kind = "huggingface"
+        else:
+            kind = "heuristic"
+    try:
+        if kind == "tiktoken":
+            return _tiktoken(settings.openai_model)
+        if kind == "huggingface":
+            return _huggingface(settings.ollama_tokenizer)
+    except Exception as exc:
+        # Not installed, or the vocabulary could not be downloaded
+        logger.warning("Token counter %s unavailable (%s); using heuristic", kind, exc)
+    return _heuristic()
+
+
+_HEURISTIC = _heuristic()
+_counter: TokenCounter | None = None
+_memo: OrderedDict[tuple[str, str], int] = OrderedDict()
+_memo_lock = Lock()
+
+
+async def init_token_counter() -> TokenCounter:
+    """Load the configured tokenizer off the event loop.
+
+    A tokenizer that has not loaded within ``token_counter_load_timeout_seconds``
+    (e.g. a download stalled behind a firewall) is given up on and the
+    heuristic is used instead.
+    """
+    global _counter
+    if _counter is None:
+        try:
+            _counter = await asyncio.wait_for(
+                asyncio.to_thread(_build_counter),
+                timeout=settings.token_counter_load_timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Token counter %s did not load within %ss; using heuristic",
+                settings.token_counter,
+                settings.token_counter_load_timeout_seconds,
+            )
+            _counter = _HEURISTIC
+        logger.info("Counting tokens with %s", _counter.name)
+    return _counter
+
+
+def get_token_counter() -> TokenCounter:
+    """The counter loaded by ``init_token_counter``, else the heuristic."""
+    return _counter or _HEURISTIC
+
+
+def count_tokens(text: str, counter: Optional[TokenCounter] = None) -> int:
+    """Return the token count of ``text``, memoised by its hash."""
+    counter = counter or get_token_counter()
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    key = (counter.name, digest)
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+    tokens = counter.count(text)
+    with _memo_lock:
+        _memo[key] = tokens
+        while len(_memo) > _MEMO_SIZE:
+            _memo.popitem(last=False)
+    return tokens
@@ -0,0 +1,91 @@
+"""Deterministic transcript cleaning — fewer prompt tokens for every chain.
+
+Auto-generated captions carry noise the model pays for on every call:
+``[Music]`` / ``[Applause]`` annotations, filler words, phrases repeated
+where caption segments overlap, and ragged whitespace. ``clean_transcript``
+strips all of it with plain regexes; it never rewrites the remaining words.
+It flattens line breaks and drops repeats, so it is only meant for YouTube
+captions; other text gets ``collapse_whitespace``.
+"""
+from __future__ import annotations
+
+import re
+
+# Annotations YouTube's captions insert, in [brackets] or (parentheses).
+# Only these words match, so [Optional], [index] and arr[mid] are kept.
+_ANNOTATIONS = (
+    "music", "applause", "laughter", "laughs", "laughing", "inaudible",
+    "silence", "cheering", "cheers", "sound", "noise", "foreign",
+    "background music", "upbeat music", "no audio", "crosstalk",
+)
+_ANNOTATION_RE = re.compile(
+    r"(?<![\w\]])\[\s*(?:%s)\s*\]" % "|".join(map(re.escape, _ANNOTATIONS))
+    + r"|\(\s*(?:%s)\s*\)" % "|".join(map(re.escape, _ANNOTATIONS))
+    + r"|♪[^♪\n]{0,200}♪|♪",
+    re.IGNORECASE,
+)
+
+# ">> Speaker" marks, but not a shift such as "x >> 1"
+_SPEAKER_RE = re.compile(r"(?:^|(?<=\s))>>(?=\s*[A-Z])", re.MULTILINE)
+
+# Standalone hesitation sounds only; words like "like" or "so" carry meaning
+_FILLER_RE = re.compile(
+    r"(?<![\w'-])(?:u+h+m*|u+m+|e+r+m+|h+m+|m+h+m+|mm+-?hmm+|a+h+)(?![\w'-])[,.]?",
+    re.IGNORECASE,
+)
+
+# Longest phrase (in words) checked for an immediate repeat
+_MAX_REPEAT_WORDS = 8
+
+_HAS_LETTER_RE = re.compile(r"[^\W\d_]")
+
+
+def _normalise_word(word: str) -> str:
+    return word.strip(",.!?;:\"'").lower()
+
+
+def collapse_repeats(words: list[str], max_words: int = _MAX_REPEAT_WORDS) -> list[str]:
+    """Drop phrases that repeat immediately, e.g. from overlapping captions.
+
+    "so we we sort the list so we sort the list" becomes
+    "so we sort the list". Phrases without letters are kept, so repeated
+    numbers such as "0 0 1 1" survive.
+    """
+    keys = [_normalise_word(w) for w in words]
+    out: list[str] = []
+    out_keys: list[str] = []
+    for word, key in zip(words, keys):
+        out.append(word)
+        out_keys.append(key)
+        # Whenever the tail of the output is a phrase followed by itself,
+        # drop the second copy — longest phrase first
+        for n in range(min(max_words, len(out) // 2), 0, -1):
+            tail = out_keys[-n:]
+            if tail == out_keys[-2 * n:-n] and any(
+                _HAS_LETTER_RE.search(k) for k in tail
+            ):
+                del out[-n:]
+                del out_keys[-n:]
+                break
+    return out
+
+
+def collapse_whitespace(text: str) -> str:
+    """Strip trailing spaces and runs of blank lines, keeping line structure."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"[ \t\f\v]+\n", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def clean_transcript(text: str) -> str:
+    """Remove caption noise, filler words and repeated phrases."""
+    text = _ANNOTATION_RE.sub(" ", text)
+    text = _SPEAKER_RE.sub(" ", text)
+    text = _FILLER_RE.sub(" ", text)
+    paragraphs = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        words = paragraph.split()
+        if words:
+            paragraphs.append(" ".join(collapse_repeats(words)))
+    return "\n\n".join(paragraphs)
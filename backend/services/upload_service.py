@@ -0,0 +1,63 @@
+"""Streaming upload handling — spool to disk in chunks, hash, enforce size."""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from fastapi import UploadFile
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the allowed size."""
+
+
+@dataclass
+class SpooledUpload:
+    path: Path
+    size: int
+    sha256: str
+
+
+@asynccontextmanager
+async def spool_upload(
+    upload: UploadFile,
+    max_bytes: int,
+    directory: Optional[str | os.PathLike] = None,
+) -> AsyncIterator[SpooledUpload]:
+    """Copy an upload to a temporary file chunk by chunk, hashing as it goes.
+
+    At most one chunk is held in memory, and the copy stops with
+    ``UploadTooLargeError`` as soon as more than ``max_bytes`` have been read.
+    The file is written to disk rather than kept in a ``SpooledTemporaryFile``
+    so PyMuPDF can open it by path. It is deleted on exit unless the caller
+    has moved it elsewhere (e.g. into the artifact store).
+    """
+    if directory is not None:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".pdf")
+    path = Path(name)
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"Upload exceeds the {max_bytes // (1024 * 1024)} MB size limit."
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+        yield SpooledUpload(path=path, size=size, sha256=digest.hexdigest())
+    finally:
+        path.unlink(missing_ok=True)
@@ -72,8 +72,3 @@ def get_transcript(url: str, use_cache: bool = True) -> tuple[str, str | None]:
             _cache[video_id] = transcript_text
 
     return transcript_text, video_id
-
-
-def approximate_token_count(text: str) -> int:
-    """Approximate token count: ~4 characters per token."""
-    return max(1, len(text) // 4)
@@ -3,31 +3,67 @@ import { useState, useEffect, useCallback } from "react";
 const API_BASE = import.meta.env.VITE_API_URL || "http://localhost:8000";
 
 /**
- * Poll GET /api/status/:jobId every 2 seconds.
- * Stops automatically when status is "done" or "error".
+ * Track a job's status.
+ * Subscribes to GET /api/status/:jobId/events (server-sent events) and falls
+ * back to polling GET /api/status/:jobId every 2 seconds if the stream is
+ * unavailable. Stops automatically when status is "done" or "error".
  */
 export function useJobPolling(jobId) {
-    const [status, setStatus] = useState(null); // pending | extracting | processing | done | error
+    const [status, setStatus] = useState(null); // pending | extracting | preparing | processing | done | error
     const [progress, setProgress] = useState(0);
     const [error, setError] = useState(null);
+    const [streamFailed, setStreamFailed] = useState(false);
+
+    const apply = useCallback((data) => {
+        setStatus(data.status);
+        setProgress(data.progress);
+        if (data.error) setError(data.error);
+    }, []);
 
     const poll = useCallback(async () => {
         if (!jobId) return;
         try {
             const res = await fetch(`${API_BASE}/api/status/${jobId}`);
             const json = await res.json();
-            if (json.success && json.data) {
-                setStatus(json.data.status);
-                setProgress(json.data.progress);
-                if (json.data.error) setError(json.data.error);
-            }
+            if (json.success && json.data) apply(json.data);
         } catch (err) {
             setError(err.message);
         }
-    }, [jobId]);
+    }, [jobId, apply]);
+
+    // Push updates over SSE
+    useEffect(() => {
+        if (!jobId || streamFailed || typeof EventSource === "undefined") return;
+
+        const source = new EventSource(`${API_BASE}/api/status/${jobId}/events`);
+        let finished = false;
+
+        source.addEventListener("status", (event) => {
+            try {
+                const data = JSON.parse(event.data);
+                apply(data);
+                if (data.status === "done" || data.status === "error") {
+                    finished = true;
+                    source.close();
+                }
+            } catch (_) { }
+        });
+
+        source.onerror = () => {
+            // The browser reconnects on its own; give up on SSE only if
+            // the connection cannot be established at all
+            if (!finished && source.readyState === EventSource.CLOSED) {
+                setStreamFailed(true);
+            }
+        };
+
+        return () => source.close();
+    }, [jobId, streamFailed, apply]);
 
+    // Polling fallback
     useEffect(() => {
         if (!jobId) return;
+        if (!streamFailed && typeof EventSource !== "undefined") return;
 
         // Initial poll
         poll();
@@ -42,7 +78,7 @@ export function useJobPolling(jobId) {
         }, 2000);
 
         return () => clearInterval(interval);
-    }, [jobId, status, poll]);
+    }, [jobId, status, poll, streamFailed]);
 
     return { status, progress, error };
 }
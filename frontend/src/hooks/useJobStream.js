@@ -0,0 +1,59 @@
+import { useState, useEffect } from "react";
+
+const API_BASE = import.meta.env.VITE_API_URL || "http://localhost:8000";
+
+/**
+ * Follow a job's output as it is generated.
+ * Subscribes to GET /api/jobs/:jobId/stream and rebuilds the text of each
+ * artifact (theory, notebook, flowchart) from its events. Returns
+ * { artifacts, finished } where artifacts maps artifact → text so far.
+ */
+export function useJobStream(jobId) {
+    const [artifacts, setArtifacts] = useState({});
+    const [finished, setFinished] = useState(false);
+
+    useEffect(() => {
+        if (!jobId || typeof EventSource === "undefined") return;
+
+        setArtifacts({});
+        setFinished(false);
+        const source = new EventSource(`${API_BASE}/api/jobs/${jobId}/stream`);
+
+        const on = (name, update) => {
+            source.addEventListener(name, (event) => {
+                try {
+                    update(JSON.parse(event.data));
+                } catch (_) { }
+            });
+        };
+        const replace = (artifact, text) =>
+            setArtifacts((prev) => ({ ...prev, [artifact]: text }));
+
+        on("snapshot", (data) => replace(data.artifact, data.content));
+        on("token", (data) =>
+            setArtifacts((prev) => ({
+                ...prev,
+                [data.artifact]: (prev[data.artifact] || "") + data.token,
+            }))
+        );
+        on("reset", (data) => replace(data.artifact, ""));
+        on("artifact_done", (data) => replace(data.artifact, data.content));
+        // Sent when this client fell behind and events were dropped
+        on("resync", (data) => setArtifacts(data.artifacts || {}));
+
+        const finish = () => {
+            setFinished(true);
+            source.close();
+        };
+        source.addEventListener("done", finish);
+        // Server-sent "error" events carry data; connection errors don't,
+        // and the browser retries those on its own
+        source.addEventListener("error", (event) => {
+            if (event.data) finish();
+        });
+
+        return () => source.close();
+    }, [jobId]);
+
+    return { artifacts, finished };
+}
@@ -1,9 +1,16 @@
 import { useState, useRef } from "react";
 import { Link, useNavigate } from "react-router-dom";
 import { useJobPolling } from "../hooks/useJobPolling";
+import { useJobStream } from "../hooks/useJobStream";
 
 const API_BASE = import.meta.env.VITE_API_URL || "http://localhost:8000";
 
+const ARTIFACT_LABELS = {
+    theory: "Theory Notes",
+    notebook: "Code Notebook",
+    flowchart: "Flowchart",
+};
+
 export default function InputPage() {
     const [mode, setMode] = useState("youtube"); // youtube | transcript | pdf
     const [url, setUrl] = useState("");
@@ -16,6 +23,7 @@ export default function InputPage() {
     const navigate = useNavigate();
 
     const { status, progress, error: pollError } = useJobPolling(jobId);
+    const { artifacts: liveArtifacts } = useJobStream(jobId);
 
     // Redirect to results when done
     if (status === "done" && jobId) {
@@ -259,6 +267,23 @@ export default function InputPage() {
                         </div>
                     )}
 
+                    {isProcessing && Object.keys(ARTIFACT_LABELS).some((a) => liveArtifacts[a]) && (
+                        <div className="mb-6 space-y-3">
+                            {Object.entries(ARTIFACT_LABELS)
+                                .filter(([artifact]) => liveArtifacts[artifact])
+                                .map(([artifact, label]) => (
+                                    <details key={artifact} open={artifact === "theory"} className="bg-white border border-border-light rounded-lg">
+                                        <summary className="px-4 py-2 text-xs font-medium text-text-secondary cursor-pointer select-none">
+                                            {label} — live preview
+                                        </summary>
+                                        <pre className="px-4 pb-4 max-h-64 overflow-y-auto text-xs font-mono text-text-primary whitespace-pre-wrap">
+                                            {liveArtifacts[artifact]}
+                                        </pre>
+                                    </details>
+                                ))}
+                        </div>
+                    )}
+
                     <button
                         type="submit"
                         disabled={submitting || isProcessing || (mode === "pdf" && !pdfFile)}
@@ -1,10 +1,18 @@
 import { useState, useEffect, useRef } from "react";
 import { useParams, Link } from "react-router-dom";
-import { fetchResults } from "../store/resultStore";
+import { fetchArtifact } from "../store/resultStore";
+
+// Artifacts shown by each tab — only these are fetched when the tab opens
+const TAB_ARTIFACTS = {
+    theory: ["theory"],
+    notebook: ["notebook"],
+    flowchart: ["flowchart"],
+    split: ["theory", "notebook"],
+};
 
 export default function Results() {
     const { jobId } = useParams();
-    const [data, setData] = useState(null);
+    const [data, setData] = useState({});
     const [error, setError] = useState(null);
     const [activeTab, setActiveTab] = useState("theory");
     const [copied, setCopied] = useState(false);
@@ -12,10 +20,12 @@ export default function Results() {
 
     useEffect(() => {
         if (!jobId) return;
-        fetchResults(jobId)
-            .then(setData)
-            .catch((err) => setError(err.message));
-    }, [jobId]);
+        TAB_ARTIFACTS[activeTab].forEach((artifact) => {
+            fetchArtifact(jobId, artifact)
+                .then((result) => setData((prev) => ({ ...prev, [artifact]: result })))
+                .catch((err) => setError(err.message));
+        });
+    }, [jobId, activeTab]);
 
     // Render Mermaid diagram whenever the flowchart tab is active and data is ready
     useEffect(() => {
@@ -76,16 +86,7 @@ export default function Results() {
         );
     }
 
-    if (!data) {
-        return (
-            <div className="min-h-screen bg-bg-page font-body flex items-center justify-center">
-                <div className="text-center">
-                    <div className="w-8 h-8 border-2 border-accent border-t-transparent rounded-full animate-spin mx-auto mb-4" />
-                    <p className="text-text-secondary text-sm">Loading results...</p>
-                </div>
-            </div>
-        );
-    }
+    const loaded = TAB_ARTIFACTS[activeTab].every((artifact) => data[artifact]);
 
     const theoryContent = data.theory?.content || "";
     const notebookContent = data.notebook?.content || "";
@@ -137,7 +138,14 @@ export default function Results() {
 
             {/* Content */}
             <div className="max-w-content mx-auto px-10 py-8">
-                {activeTab === "theory" && (
+                {!loaded && (
+                    <div className="text-center py-16">
+                        <div className="w-8 h-8 border-2 border-accent border-t-transparent rounded-full animate-spin mx-auto mb-4" />
+                        <p className="text-text-secondary text-sm">Loading results...</p>
+                    </div>
+                )}
+
+                {loaded && activeTab === "theory" && (
                     <div className="bg-white border border-border-light rounded-xl p-8">
                         <div className="flex items-center justify-between mb-6">
                             <h2 className="text-xl font-heading font-bold text-text-primary">Theory Notes</h2>
@@ -152,7 +160,7 @@ export default function Results() {
                     </div>
                 )}
 
-                {activeTab === "notebook" && (
+                {loaded && activeTab === "notebook" && (
                     <div className="bg-white border border-border-light rounded-xl p-8">
                         <div className="flex items-center justify-between mb-6">
                             <h2 className="text-xl font-heading font-bold text-text-primary">Code Notebook</h2>
@@ -167,7 +175,7 @@ export default function Results() {
                     </div>
                 )}
 
-                {activeTab === "flowchart" && (
+                {loaded && activeTab === "flowchart" && (
                     <div className="bg-white border border-border-light rounded-xl p-8">
                         <div className="flex items-center justify-between mb-6">
                             <div>
@@ -213,7 +221,7 @@ export default function Results() {
                     </div>
                 )}
 
-                {activeTab === "split" && (
+                {loaded && activeTab === "split" && (
                     <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
                         <div className="bg-white border border-border-light rounded-xl p-6">
                             <h2 className="text-lg font-heading font-bold text-text-primary mb-4">Theory Notes</h2>
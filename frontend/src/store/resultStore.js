@@ -1,5 +1,6 @@
 /**
- * Simple result store — fetches /api/results/:jobId and caches the data.
+ * Simple result store — fetches /api/results/:jobId (or a single artifact from
+ * /api/results/:jobId/:artifact) and caches the data.
  */
 const API_BASE = import.meta.env.VITE_API_URL || "http://localhost:8000";
 
@@ -19,6 +20,25 @@ export async function fetchResults(jobId) {
     throw new Error(json.error || "Failed to load results");
 }
 
+const artifactCache = {};
+
+export async function fetchArtifact(jobId, artifact) {
+    const key = `${jobId}/${artifact}`;
+    if (artifactCache[key]) return artifactCache[key];
+
+    // Finished artifacts carry an ETag and long-lived Cache-Control, so the
+    // browser cache serves repeat visits
+    const res = await fetch(`${API_BASE}/api/results/${jobId}/${artifact}`);
+    const json = await res.json();
+
+    if (json.success && json.data) {
+        artifactCache[key] = json.data;
+        return json.data;
+    }
+
+    throw new Error(json.error || "Failed to load results");
+}
+
 export function getCachedResult(jobId) {
     return resultCache[jobId] || null;
 }